@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+check_tools.py 基准测试脚本
+功能：
+1. 启动本地 HTTP 模拟服务（可配置延迟、错误率、不支持 HEAD 的主机、重定向、大响应体）
+2. 启动模拟的 api.github.com（仓库/release JSON、GraphQL、速率限制响应头）
+3. 生成含 100 ~ 50,000 个链接的 Markdown，调用 check_tools 的真实入口函数
+4. 统计 links/sec、p50/p95/p99 延迟和峰值内存，结果写入 JSON 便于跨提交比较
+5. 以独立进程运行 --help 和小输入，记录启动耗时和峰值内存并与预算比较
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict
+
+# 配置
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_HOSTS = 20  # 模拟的链接主机数量（每个主机一个端口）
+DEFAULT_REPOS = 100
+OUTPUT_FILE = 'bench_results.json'
+STARTUP_REPEATS = 5  # 启动场景的重复次数，取耗时中位数
+STARTUP_TINY_LINKS = 5  # 小输入场景的链接数量（模拟 CI 中的小 README 改动）
+# 启动场景的预算：墙钟耗时 (ms) 和峰值 RSS (MB)
+STARTUP_BUDGET = {
+    'help': {'wall_ms': 300, 'peak_rss_mb': 30},
+    'tiny': {'wall_ms': 800, 'peak_rss_mb': 50},
+}
+
+
+class BenchServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 默认的 5 在高并发下会导致连接被拒绝
+
+    def handle_error(self, request, client_address):
+        # 客户端提前关闭连接（有限 GET、熔断）属于正常情况
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+
+def pick(path: str, salt: str) -> float:
+    """根据路径得到稳定的 [0, 1) 伪随机数，保证多次运行行为一致"""
+    return (zlib.crc32(f'{salt}:{path}'.encode()) & 0xffffffff) / 2 ** 32
+
+
+def make_link_handler(behavior: Dict):
+    """
+    构造链接主机的请求处理器
+    behavior: {'latency', 'jitter', 'error_rate', 'server_error_rate',
+               'redirect_rate', 'large_rate', 'large_size', 'head_unsupported'}
+    """
+
+    class LinkHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, send_body: bool):
+            path = self.path.split('?')[0]
+            delay = behavior['latency'] + random.uniform(0, behavior['jitter'])
+            if delay > 0:
+                time.sleep(delay)
+
+            if self.command == 'HEAD' and behavior['head_unsupported']:
+                status, size = 405, 0
+            elif path.endswith('/final'):
+                status, size = 200, 64
+            elif pick(path, 'error') < behavior['error_rate']:
+                status, size = 404, 64
+            elif pick(path, 'server_error') < behavior['server_error_rate']:
+                status, size = 503, 64
+            elif pick(path, 'redirect') < behavior['redirect_rate']:
+                self.send_response(301)
+                self.send_header('Location', path + '/final')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            elif pick(path, 'large') < behavior['large_rate']:
+                status, size = 200, behavior['large_size']
+            else:
+                status, size = 200, 64
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(size))
+            self.end_headers()
+            if not send_body:
+                return
+
+            chunk = b'x' * 65536
+            try:
+                remaining = size
+                while remaining > 0:
+                    self.wfile.write(chunk[:min(remaining, len(chunk))])
+                    remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # 有限 GET 会提前关闭连接
+                self.close_connection = True
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def do_GET(self):
+            self._respond(True)
+
+    return LinkHandler
+
+
+def make_github_handler(behavior: Dict):
+    """
+    构造模拟 GitHub API 的请求处理器
+    behavior: {'latency', 'rate_limit', 'archived_rate', 'missing_rate', 'release_rate'}
+    """
+    state = {'remaining': behavior['rate_limit'], 'reset': int(time.time()) + 3600}
+    lock = threading.Lock()
+
+    def repo_payload(name: str) -> Dict:
+        days = int(pick(name, 'days') * 400)
+        return {
+            'archived': pick(name, 'archived') < behavior['archived_rate'],
+            'pushed_at': (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'stargazers_count': int(pick(name, 'stars') * 30000),
+            'forks_count': int(pick(name, 'forks') * 5000),
+            'license': {'spdx_id': 'MIT'},
+        }
+
+    class GitHubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, payload):
+            with lock:
+                state['remaining'] = max(state['remaining'] - 1, 0)
+                remaining = state['remaining']
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-RateLimit-Limit', str(behavior['rate_limit']))
+            self.send_header('X-RateLimit-Remaining', str(remaining))
+            self.send_header('X-RateLimit-Reset', str(state['reset']))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(behavior['latency'])
+            parts = self.path.strip('/').split('/')
+            if len(parts) < 3 or parts[0] != 'repos':
+                self._send_json(404, {'message': 'Not Found'})
+                return
+
+            name = f'{parts[1]}/{parts[2]}'
+            if pick(name, 'missing') < behavior['missing_rate']:
+                self._send_json(404, {'message': 'Not Found'})
+            elif parts[3:] == ['releases', 'latest']:
+                if pick(name, 'release') < behavior['release_rate']:
+                    self._send_json(200, {'tag_name': f'v{int(pick(name, "tag") * 10)}.0.0'})
+                else:
+                    self._send_json(404, {'message': 'Not Found'})
+            else:
+                self._send_json(200, repo_payload(name))
+
+        def do_POST(self):
+            time.sleep(behavior['latency'])
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            variables = request.get('variables', {})
+            data = {}
+            for i in range(len(variables) // 2):
+                name = f"{variables[f'o{i}']}/{variables[f'n{i}']}"
+                if pick(name, 'missing') < behavior['missing_rate']:
+                    data[f'r{i}'] = None
+                    continue
+                payload = repo_payload(name)
+                release = pick(name, 'release') < behavior['release_rate']
+                data[f'r{i}'] = {
+                    'stargazerCount': payload['stargazers_count'],
+                    'forkCount': payload['forks_count'],
+                    'licenseInfo': {'spdxId': 'MIT'},
+                    'pushedAt': payload['pushed_at'],
+                    'isArchived': payload['archived'],
+                    'latestRelease': {'tagName': f'v{int(pick(name, "tag") * 10)}.0.0'} if release else None,
+                }
+            self._send_json(200, {'data': data})
+
+    return GitHubHandler
+
+
+def serve(config: Dict, ready):
+    """在子进程中启动所有模拟服务，并通过 ready 队列返回端口"""
+    servers = []
+    link_ports = []
+    for i in range(config['hosts']):
+        behavior = dict(config['link_behavior'])
+        behavior['head_unsupported'] = i < config['head_unsupported_hosts']
+        server = BenchServer(('127.0.0.1', 0), make_link_handler(behavior))
+        servers.append(server)
+        link_ports.append(server.server_address[1])
+
+    github = BenchServer(('127.0.0.1', 0), make_github_handler(config['github_behavior']))
+    servers.append(github)
+
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    ready.put({'link_ports': link_ports, 'github_port': github.server_address[1]})
+    threading.Event().wait()
+
+
+def generate_markdown(path: str, links: int, repos: int, link_ports: List[int]):
+    """生成合成的 Markdown：仓库表格 + 指向各模拟主机的普通链接"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('# Benchmark\n\n| 名称 | 地址 | 说明 |\n|------|------|------|\n')
+        for i in range(repos):
+            f.write(f'| Tool {i} | [GitHub](https://github.com/bench-org/tool-{i}) | synthetic |\n')
+        f.write('\n## Links\n\n')
+        for i in range(links):
+            port = link_ports[i % len(link_ports)]
+            f.write(f'- [link {i}](http://127.0.0.1:{port}/p/{i})\n')
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """计算 p50/p95/p99（毫秒）"""
+    if not samples:
+        return {'p50': None, 'p95': None, 'p99': None}
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+    return {'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99)}
+
+
+def rss_mb(maxrss: int) -> float:
+    """ru_maxrss 换算为 MB，Linux 上单位为 KB，macOS 为字节"""
+    if sys.platform == 'darwin':
+        maxrss /= 1024
+    return round(maxrss / 1024, 1)
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值 RSS（MB）"""
+    return rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def run_child(cmd: List[str], cwd: str) -> Dict[str, float]:
+    """运行一个子进程，返回其墙钟耗时 (ms) 和自身的峰值 RSS (MB)；os.wait4 只统计该子进程"""
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {'wall_ms': elapsed * 1000, 'peak_rss_mb': rss_mb(usage.ru_maxrss)}
+
+
+def measure_startup(workdir: str, link_ports: List[int], repeats: int) -> List[Dict]:
+    """
+    启动场景：--help，以及只含少量链接、不生成报告的 --links-only 运行
+    每个场景重复 repeats 次，取耗时中位数和峰值内存最大值，并与 STARTUP_BUDGET 比较
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'check_tools.py')
+    markdown = os.path.join(workdir, 'tiny.md')
+    generate_markdown(markdown, STARTUP_TINY_LINKS, 0, link_ports)
+    scenarios = [
+        ('help', 0, [sys.executable, script, '--help']),
+        ('tiny', STARTUP_TINY_LINKS, [sys.executable, script, '--links-only', '--input', markdown, '--no-cache',
+                                      '--no-history', '--no-progress', '--report', 'none']),
+    ]
+
+    runs = []
+    for name, size, cmd in scenarios:
+        samples = [run_child(cmd, workdir) for _ in range(repeats)]
+        wall_ms = sorted(sample['wall_ms'] for sample in samples)[len(samples) // 2]
+        peak = max(sample['peak_rss_mb'] for sample in samples)
+        budget = STARTUP_BUDGET[name]
+        runs.append({
+            'phase': 'startup',
+            'engine': name,
+            'size': size,
+            'wall_ms': round(wall_ms, 1),
+            'peak_rss_mb': peak,
+            'budget': budget,
+            'within_budget': wall_ms <= budget['wall_ms'] and peak <= budget['peak_rss_mb'],
+        })
+    return runs
+
+
+def timed(func, samples: List[float]):
+    """包装检查函数，记录每次调用的耗时"""
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+
+    return wrapper
+
+
+def timed_async(func, samples: List[float]):
+    """包装异步检查函数，记录每次调用的耗时"""
+
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+
+    return wrapper
+
+
+def run_scenario(scenario: Dict, output):
+    """
+    在独立子进程中运行一个场景，保证峰值内存互不影响
+    scenario: {'phase', 'engine', 'backend', 'size', 'markdown', 'github_port', ...}
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import check_tools
+
+    check_tools.GITHUB_API_URL = f"http://127.0.0.1:{scenario['github_port']}"
+    check_tools.GITHUB_TOKEN = 'benchmark-token'
+    check_tools.TIMEOUT = scenario['timeout']
+    check_tools.RESULT_CACHE = None
+
+    items = list(check_tools.extract_markdown([scenario['markdown']]))
+    samples: List[float] = []
+
+    # 进度输出写入 /dev/null，保留打印本身的开销
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        if scenario['phase'] == 'links':
+            links = [(item.text, item.url) for item in items if item.kind == 'link']
+            if scenario['engine'] == 'async':
+                check_tools.check_url_async = timed_async(check_tools.check_url_async, samples)
+                results = check_tools.check_links_async(links, scenario['concurrency'], scenario['per_host'])
+            else:
+                check_tools.check_url = timed(check_tools.check_url, samples)
+                results = check_tools.check_links_parallel(links)
+        else:
+            repos = [(item.text, item.url) for item in items if item.kind == 'repo']
+            # GraphQL 后端按批次记录延迟
+            if scenario['backend'] == 'graphql':
+                check_tools.check_github_repos_graphql_batch = timed(
+                    check_tools.check_github_repos_graphql_batch, samples)
+            else:
+                check_tools.check_github_repo = timed(check_tools.check_github_repo, samples)
+            results = check_tools.check_github_repos(repos, backend=scenario['backend'])
+    finally:
+        elapsed = time.perf_counter() - start
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    statuses: Dict[str, int] = {}
+    for r in results:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+
+    output.put({
+        'phase': scenario['phase'],
+        'engine': scenario['engine'] if scenario['phase'] == 'links' else scenario['backend'],
+        'size': len(results),
+        'elapsed_sec': round(elapsed, 3),
+        'items_per_sec': round(len(results) / elapsed, 1) if elapsed else None,
+        'latency_ms': percentiles(samples),
+        'peak_rss_mb': peak_rss_mb(),
+        'statuses': statuses,
+    })
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous_file: str, runs: List[Dict]):
+    """与之前的结果文件比较吞吐量"""
+    with open(previous_file, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    old = {(r['phase'], r['engine'], r['size']): r for r in previous.get('runs', [])}
+
+    print(f"\n与 {previous_file} ({previous.get('commit')}) 比较:")
+    for r in runs:
+        before = old.get((r['phase'], r['engine'], r['size']))
+        if before and r['phase'] == 'startup' and before.get('wall_ms'):
+            print(f"  {r['phase']:<7} {r['engine']:<8}: {before['wall_ms']:>7.1f} -> {r['wall_ms']:>7.1f} ms, "
+                  f"{before['peak_rss_mb']} -> {r['peak_rss_mb']} MB")
+            continue
+        if not before or not before.get('items_per_sec') or not r.get('items_per_sec'):
+            continue
+        ratio = r['items_per_sec'] / before['items_per_sec']
+        print(f"  {r['phase']:<6} {r['engine']:<8} {r['size']:>6}: "
+              f"{before['items_per_sec']:>9.1f} -> {r['items_per_sec']:>9.1f} /s ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='check_tools.py 基准测试')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help=f'链接数量列表，逗号分隔 (默认: {",".join(map(str, DEFAULT_SIZES))})')
+    parser.add_argument('--engines', default='thread,async', help='链接检查引擎列表 (默认: thread,async)')
+    parser.add_argument('--repos', type=int, default=DEFAULT_REPOS, help=f'仓库数量，0 表示跳过 (默认: {DEFAULT_REPOS})')
+    parser.add_argument('--backends', default='rest,graphql', help='仓库检查后端列表 (默认: rest,graphql)')
+    parser.add_argument('--hosts', type=int, default=DEFAULT_HOSTS, help=f'模拟主机数量 (默认: {DEFAULT_HOSTS})')
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟服务基础延迟（秒）(默认: 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.03, help='模拟服务延迟抖动（秒）(默认: 0.03)')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='返回 404 的比例 (默认: 0.05)')
+    parser.add_argument('--server-error-rate', type=float, default=0.0, help='返回 503 的比例 (默认: 0)')
+    parser.add_argument('--redirect-rate', type=float, default=0.1, help='返回 301 的比例 (默认: 0.1)')
+    parser.add_argument('--large-rate', type=float, default=0.02, help='返回大响应体的比例 (默认: 0.02)')
+    parser.add_argument('--large-size', type=int, default=5 * 1024 * 1024, help='大响应体字节数 (默认: 5MB)')
+    parser.add_argument('--head-unsupported', type=int, default=2, help='不支持 HEAD 的主机数量 (默认: 2)')
+    parser.add_argument('--rate-limit', type=int, default=5000, help='模拟 GitHub API 配额 (默认: 5000)')
+    parser.add_argument('--concurrency', type=int, default=200, help='异步引擎全局并发上限 (默认: 200)')
+    parser.add_argument('--per-host', type=int, default=8, help='异步引擎单主机并发上限 (默认: 8)')
+    parser.add_argument('--timeout', type=float, default=10, help='请求超时（秒）(默认: 10)')
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f'结果 JSON 文件 (默认: {OUTPUT_FILE})')
+    parser.add_argument('--compare', metavar='FILE', help='与之前的结果文件比较')
+    parser.add_argument('--startup-repeats', type=int, default=STARTUP_REPEATS,
+                        help=f'启动场景 (--help 和小输入) 的重复次数，0 表示跳过 (默认: {STARTUP_REPEATS})')
+
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    engines = [engine for engine in args.engines.split(',') if engine]
+    backends = [backend for backend in args.backends.split(',') if backend] if args.repos else []
+
+    config = {
+        'hosts': args.hosts,
+        'head_unsupported_hosts': args.head_unsupported,
+        'link_behavior': {
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'error_rate': args.error_rate,
+            'server_error_rate': args.server_error_rate,
+            'redirect_rate': args.redirect_rate,
+            'large_rate': args.large_rate,
+            'large_size': args.large_size,
+        },
+        'github_behavior': {
+            'latency': args.latency,
+            'rate_limit': args.rate_limit,
+            'archived_rate': 0.05,
+            'missing_rate': 0.03,
+            'release_rate': 0.6,
+        },
+    }
+
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    server_process = context.Process(target=serve, args=(config, ready), daemon=True)
+    server_process.start()
+    ports = ready.get(timeout=30)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.startup_repeats > 0:
+            print("运行启动场景 ...", flush=True)
+            for result in measure_startup(workdir, ports['link_ports'], args.startup_repeats):
+                runs.append(result)
+                budget = result['budget']
+                mark = '✓' if result['within_budget'] else '✗ 超出预算'
+                print(f"  {result['engine']}: 耗时 {result['wall_ms']} ms (预算 {budget['wall_ms']}), "
+                      f"峰值内存 {result['peak_rss_mb']} MB (预算 {budget['peak_rss_mb']}) {mark}")
+
+        scenarios = []
+        for size in sizes:
+            markdown = os.path.join(workdir, f'links_{size}.md')
+            generate_markdown(markdown, size, 0, ports['link_ports'])
+            for engine in engines:
+                scenarios.append({'phase': 'links', 'engine': engine, 'size': size, 'markdown': markdown})
+        if backends:
+            markdown = os.path.join(workdir, 'repos.md')
+            generate_markdown(markdown, 0, args.repos, ports['link_ports'])
+            for backend in backends:
+                scenarios.append({'phase': 'repos', 'backend': backend, 'engine': None,
+                                  'size': args.repos, 'markdown': markdown})
+
+        for scenario in scenarios:
+            scenario.update({
+                'github_port': ports['github_port'],
+                'timeout': args.timeout,
+                'concurrency': args.concurrency,
+                'per_host': args.per_host,
+                'backend': scenario.get('backend', 'rest'),
+            })
+            label = scenario['engine'] or scenario['backend']
+            print(f"运行 {scenario['phase']} / {label} / {scenario['size']} ...", flush=True)
+
+            output = context.Queue()
+            process = context.Process(target=run_scenario, args=(scenario, output))
+            process.start()
+            result = output.get()
+            process.join()
+            runs.append(result)
+
+            latency = result['latency_ms']
+            print(f"  {result['items_per_sec']}/s, 耗时 {result['elapsed_sec']}s, "
+                  f"p50/p95/p99 = {latency['p50']}/{latency['p95']}/{latency['p99']} ms, "
+                  f"峰值内存 {result['peak_rss_mb']} MB")
+
+    server_process.terminate()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {args.output}")
+
+    if args.compare:
+        compare(args.compare, runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,539 +7,3626 @@
 3. 生成详细的 HTML 和 Markdown 报告
 """
 
+from __future__ import annotations
+
 import re
-import requests
-import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import urlparse
+from typing import List, Dict, Tuple, Iterator, AsyncIterator, NamedTuple, Callable
+from urllib.parse import urlparse, urlsplit, urlunsplit
 import time
+import random
+import socket
+import bisect
 import argparse
+import threading
+import importlib
+import importlib.util
+import os
+import glob
+import sys
+import zlib
+import heapq
+import contextlib
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from enum import Enum
+
+IMPORT_TIMES: Dict[str, float] = {}  # 延迟导入的模块 -> 实际导入耗时（秒），供 --profile 输出
+_lazy_import_lock = threading.Lock()
+
+
+class LazyModule:
+    """
+    延迟导入的模块代理：首次访问属性时才真正导入，并把导入耗时记入 IMPORT_TIMES
+    --help 和只用到部分功能的小输入不必为 requests、aiohttp 等依赖付出启动时间
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._load()
+        return getattr(self._module, attr)
+
+    def _load(self):
+        with _lazy_import_lock:
+            if self._module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self._name)
+                IMPORT_TIMES[self._name] = time.perf_counter() - started
+                self._module = module
+
+    def __repr__(self):
+        return f'<LazyModule {self._name!r} ({"loaded" if self._module else "not loaded"})>'
+
+
+def lazy_import(name: str, optional: bool = False):
+    """返回延迟导入的模块代理；optional 为 True 且模块未安装时返回 None"""
+    if optional and importlib.util.find_spec(name) is None:
+        return None
+    return LazyModule(name)
+
+
+# 以下模块在首次使用时才导入
+requests = lazy_import('requests')
+aiohttp = lazy_import('aiohttp', optional=True)  # 可选依赖，仅 --engine async 需要
+asyncio = lazy_import('asyncio')
+futures = lazy_import('concurrent.futures')
+json = lazy_import('json')
+sqlite3 = lazy_import('sqlite3')
+subprocess = lazy_import('subprocess')
+saxutils = lazy_import('xml.sax.saxutils')
+cProfile = lazy_import('cProfile')
+pstats = lazy_import('pstats')
+resource = lazy_import('resource', optional=True)  # 仅 Unix 提供，用于统计峰值内存
+
+# 配置
+GITHUB_TOKEN = None  # 可选：设置 GitHub Token 提高 API 限制
+GITHUB_API_URL = 'https://api.github.com'  # GitHub REST API 地址（可指向本地模拟服务）
+GITHUB_MAX_WORKERS = 5  # 仓库检查并发数（过高容易触发次级速率限制）
+GITHUB_MAX_RETRIES = 3  # 触发速率限制后暂停并重试的次数
+RATE_LIMIT_RESERVE = 10  # 为其他工具保留的 API 配额
+RATE_LIMIT_MAX_WAIT = 600  # 因速率限制累计等待的上限（秒），超过后剩余请求直接返回 rate_limit；0 表示不限制
+GRAPHQL_BATCH_SIZE = 50  # GraphQL 后端每次查询的仓库数量（GitHub 建议不超过 100）
+TIMEOUT = 10
+MAX_WORKERS = 10  # 并发线程数
+ASYNC_MAX_CONCURRENCY = 200  # 异步引擎全局并发上限
+ASYNC_PER_HOST_LIMIT = 8  # 异步引擎单个主机并发上限
+POOL_CONNECTIONS = 4  # 每个主机 Session 缓存的连接池数量 (http/https 各一个即可)
+POOL_MAXSIZE = MAX_WORKERS  # 每个连接池保持的 keep-alive 连接数
+KEEP_ALIVE = True  # 是否复用 TCP/TLS 连接
+RETRY_ATTEMPTS = 2  # 超时、连接失败、429、5xx 的重试次数
+RETRY_BACKOFF = 0.5  # 指数退避基数（秒）：第 n 次重试等待 RETRY_BACKOFF * 2^n，并加入随机抖动
+RETRY_MAX_BACKOFF = 8  # 单次退避等待上限（秒），也是 Retry-After 的上限
+CIRCUIT_BREAKER_THRESHOLD = 3  # 同一主机连续多少个 URL 在重试用尽后仍网络失败即熔断，其余 URL 不再发请求
+CIRCUIT_BREAKER_COOLDOWN = 60  # 熔断后经过多少秒进入半开状态，放行一个探测请求
+DNS_CACHE_TTL = 300  # DNS 解析结果的缓存有效期（秒）
+DNS_NEGATIVE_TTL = 60  # 域名不存在 (NXDOMAIN) 结果的缓存有效期（秒）
+DNS_PREFLIGHT_WORKERS = 32  # 预解析主机名的并发数
+FALLBACK_MODE = 'stream'  # HEAD 失败后的 GET 方式: 'stream' (只读取少量字节) 或 'range' (Range: bytes=0-0)
+FALLBACK_MAX_BYTES = 1024  # 'stream' 模式下 GET 最多读取的字节数
+CACHE_FILE = '.label-tools-cache'  # 结果缓存 (SQLite)
+MANIFEST_FILE = '.label-tools-manifest.json'  # 增量模式使用的上次运行清单
+HISTORY_FILE = '.label-tools-history'  # 仓库健康历史记录 (SQLite)
+HISTORY_TREND_DAYS = 90  # HTML 报告中 Stars 增长的统计区间（天）
+HISTORY_STATUS_DAYS = 7  # HTML 报告中状态变化的比较区间（天）
+# 各状态结果的缓存有效期（秒），未列出的状态（如 rate_limit）不缓存
+CACHE_TTL = {
+    'success': 7 * 86400,
+    'warning': 86400,
+    'error': 3600,
+    'active': 86400,
+    'inactive': 3 * 86400,
+    'archived': 7 * 86400,
+    'not_found': 86400,
+}
+REPORT_PAGE_SIZE = 100  # HTML 报告表格每页行数
+REPORT_FORMATS = ('md', 'html', 'json')  # --report 可选的报告格式
+DEFAULT_REPORTS = 'md,html'  # 默认生成的报告
+JSON_REPORT_FILE = 'health_report.json'  # --report json 且未指定 --json 时的输出文件
+WATCH_POLL_INTERVAL = 2  # 监视模式检查文件变化和到期条目的间隔（秒）
+WATCH_BATCH_SIZE = 20  # 监视模式每轮最多检查的条目数，使请求量保持平稳
+WATCH_MIN_INTERVAL = 300  # 失败条目的最短复查间隔（秒）
+WATCH_MAX_INTERVAL = 7 * 24 * 3600  # 稳定条目的最长复查间隔（秒）
+WATCH_REPORT_DEBOUNCE = 30  # 结果变化后静默多少秒再重新生成报告
+WATCH_REPORT_MAX_DELAY = 300  # 结果持续变化时，报告最多推迟多少秒
+# 请求阶段耗时直方图的分桶上界（秒）
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PHASES = ('queue', 'dns', 'connect', 'tls', 'ttfb', 'total')
+SHOW_PROGRESS = True  # 是否打印逐条检查进度（--no-progress 关闭）
+PROFILE_TOP_IMPORTS = 15  # --profile 输出的导入耗时最多的模块数量
+PROFILE_TOP_FUNCTIONS = 25  # --profile 输出的累计耗时最多的函数数量
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    END = '\033[0m'
+
+
+class Status(str, Enum):
+    """检查结果状态；继承 str，可直接与字符串比较、作为字典键和序列化为 JSON"""
+    SUCCESS = 'success'
+    WARNING = 'warning'
+    ERROR = 'error'
+    ACTIVE = 'active'
+    INACTIVE = 'inactive'
+    ARCHIVED = 'archived'
+    NOT_FOUND = 'not_found'
+    RATE_LIMIT = 'rate_limit'
+    SECONDARY_RATE_LIMIT = 'secondary_rate_limit'
+
+    def __str__(self):
+        return self.value
+
+    def __hash__(self):
+        return str.__hash__(self)
+
+
+STATUS_LIST = list(Status)  # 列式存储中的状态序号 -> Status
+STATUS_INDEX = {status.value: index for index, status in enumerate(STATUS_LIST)}
+_UNSET = object()  # 记录中未设置的字段，不出现在字典视图中
+
+
+class ResultRecord(Mapping):
+    """
+    紧凑的检查结果记录
+    字段存放在 __slots__ 中，status 为 Status 枚举，重复出现的文本字段经 sys.intern 驻留；
+    实现只读 Mapping 接口（r['status']、r.get()、dict(r)），原有按字典读取结果的代码无需修改
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: Tuple[str, ...] = ()  # 取值重复率高、需要驻留的文本字段
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            self._set(name, fields.pop(name, _UNSET))
+        if fields:
+            raise TypeError(f'{type(self).__name__} 没有字段: {", ".join(fields)}')
+
+    def _set(self, name: str, value):
+        if name == 'status' and value is not _UNSET:
+            value = Status(value)
+        elif name in self.INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data: Mapping, **overrides) -> 'ResultRecord':
+        """从字典（如缓存、清单中的结果）构造记录，忽略未知字段"""
+        fields = {name: value for name, value in data.items() if name in cls.FIELDS}
+        fields.update(overrides)
+        return cls(**fields)
+
+    def replace(self, **changes) -> 'ResultRecord':
+        return type(self).from_dict(self, **changes)
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        self._set(key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self.FIELDS if getattr(self, name) is not _UNSET)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({dict(self)!r})'
+
+
+class LinkResult(ResultRecord):
+    """链接检查结果；locations 为所在位置（如 README.md:12），分发到各出现位置后才有"""
+    __slots__ = FIELDS = ('url', 'text', 'status', 'status_code', 'message', 'locations')
+    INTERNED = ('text', 'message')
+
+
+class RepoResult(ResultRecord):
+    """
+    仓库检查结果
+    from_cache 不是结果字段：为 True 表示直接取自未过期的缓存、本次没有请求 API，不作为新的历史记录
+    """
+    FIELDS = ('name', 'url', 'status', 'message', 'stars', 'forks', 'license',
+              'last_push', 'pushed_at', 'days_since_update', 'latest_release')
+    __slots__ = FIELDS + ('from_cache',)
+    INTERNED = ('message', 'license', 'last_push')
+
+
+class ResultTable:
+    """
+    列式结果容器：每个字段一列，状态列为 array('B') 中的 Status 序号
+    按状态计数、过滤、分组都只遍历状态列一次；
+    迭代时逐行生成记录对象，现有的报告函数可以直接使用
+    """
+
+    def __init__(self, record_cls: type, results=()):
+        self.record_cls = record_cls
+        self._status = array('B')
+        self._columns = {name: [] for name in record_cls.FIELDS if name != 'status'}
+        self.extend(results)
+
+    def append(self, result: Mapping):
+        """追加一条结果（记录或字典均可）"""
+        self._status.append(STATUS_INDEX[str(result['status'])])
+        for name, column in self._columns.items():
+            value = result.get(name, _UNSET)
+            if name in self.record_cls.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            column.append(value)
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        return len(self._status)
+
+    def row(self, index: int) -> ResultRecord:
+        record = self.record_cls.__new__(self.record_cls)
+        object.__setattr__(record, 'status', STATUS_LIST[self._status[index]])
+        for name, column in self._columns.items():
+            object.__setattr__(record, name, column[index])
+        return record
+
+    def __iter__(self) -> Iterator[ResultRecord]:
+        return (self.row(index) for index in range(len(self)))
+
+    def counts(self) -> Dict[str, int]:
+        """{状态: 数量}"""
+        return {STATUS_LIST[code].value: count for code, count in Counter(self._status).items()}
+
+    def filter(self, *statuses: str) -> Iterator[ResultRecord]:
+        """按状态过滤"""
+        codes = {STATUS_INDEX[str(status)] for status in statuses}
+        return (self.row(index) for index, code in enumerate(self._status) if code in codes)
+
+    def group_by_status(self) -> Dict[str, List[ResultRecord]]:
+        groups: Dict[str, List[ResultRecord]] = {}
+        for index, code in enumerate(self._status):
+            groups.setdefault(STATUS_LIST[code].value, []).append(self.row(index))
+        return groups
+
+
+class MetricsCollector:
+    """
+    请求耗时统计
+    按 (阶段, 主机) 聚合为直方图，阶段包括：
+    queue (排队等待)、dns、connect (TCP)、tls、ttfb (首字节)、total (单次检查总耗时)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRIC_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, str], Dict] = {}
+        self._url_totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.dns_preflight = None  # DNS 预解析统计，由 record_preflight 写入
+
+    def observe(self, phase: str, url: str, seconds: float):
+        """记录一次阶段耗时"""
+        host = urlparse(url).netloc.lower()
+        seconds = max(seconds, 0.0)
+        with self._lock:
+            histogram = self._histograms.get((phase, host))
+            if histogram is None:
+                histogram = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+                self._histograms[(phase, host)] = histogram
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram['buckets'][index] += 1
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            if phase == 'total':
+                self._url_totals[url] = max(self._url_totals.get(url, 0.0), seconds)
+
+    def observe_connection(self, url: str, phases: Dict[str, float], elapsed: float):
+        """记录一次 HTTP 请求：连接阶段 + 首字节时间（elapsed 为发出请求到收到响应头）"""
+        for phase, seconds in phases.items():
+            self.observe(phase, url, seconds)
+        self.observe('ttfb', url, elapsed - sum(phases.values()))
+
+    def record_preflight(self, stats: Dict):
+        """记录 DNS 预解析的主机数、结果分布和耗时"""
+        self.dns_preflight = dict(stats)
+
+    def phase_summary(self) -> Dict[str, Dict]:
+        """各阶段汇总: {阶段: {'count', 'sum', 'mean'}}"""
+        summary = {}
+        with self._lock:
+            for (phase, _), histogram in self._histograms.items():
+                entry = summary.setdefault(phase, {'count': 0, 'sum': 0.0})
+                entry['count'] += histogram['count']
+                entry['sum'] += histogram['sum']
+        for entry in summary.values():
+            entry['mean'] = entry['sum'] / entry['count'] if entry['count'] else 0.0
+        return {phase: summary[phase] for phase in METRIC_PHASES if phase in summary}
+
+    def slowest_hosts(self, limit: int = 10) -> List[Dict]:
+        """按总耗时排序的主机: [{'host', 'count', 'sum', 'mean'}]"""
+        with self._lock:
+            hosts = [
+                {'host': host, 'count': h['count'], 'sum': h['sum'], 'mean': h['sum'] / h['count']}
+                for (phase, host), h in self._histograms.items() if phase == 'total' and h['count']
+            ]
+        return sorted(hosts, key=lambda h: h['sum'], reverse=True)[:limit]
+
+    def slowest_urls(self, limit: int = 10) -> List[Tuple[str, float]]:
+        with self._lock:
+            return sorted(self._url_totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def to_json(self) -> Dict:
+        with self._lock:
+            histograms = [
+                {'phase': phase, 'host': host, 'count': h['count'], 'sum': round(h['sum'], 6),
+                 'buckets': dict(zip(map(str, self.buckets), h['buckets']))}
+                for (phase, host), h in sorted(self._histograms.items())
+            ]
+        return {
+            'phases': self.phase_summary(),
+            'histograms': histograms,
+            'slowest_hosts': self.slowest_hosts(),
+            'slowest_urls': [{'url': url, 'seconds': seconds} for url, seconds in self.slowest_urls()],
+            'dns_preflight': self.dns_preflight,
+        }
+
+    def to_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式（累积分桶）"""
+        def label(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        
+        name = 'label_tools_request_phase_seconds'
+        lines = [f'# HELP {name} Time spent in each request phase.', f'# TYPE {name} histogram']
+        with self._lock:
+            for (phase, host), h in sorted(self._histograms.items()):
+                labels = f'phase="{label(phase)}",host="{label(host)}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, h['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h["count"]}')
+                lines.append(f'{name}_sum{{{labels}}} {h["sum"]:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {h["count"]}')
+        if self.dns_preflight:
+            preflight = 'label_tools_dns_preflight'
+            lines.append(f'# HELP {preflight}_seconds Time spent resolving all hosts before checking.')
+            lines.append(f'# TYPE {preflight}_seconds gauge')
+            lines.append(f'{preflight}_seconds {self.dns_preflight["seconds"]:.6f}')
+            lines.append(f'# HELP {preflight}_hosts Hosts resolved before checking, by outcome.')
+            lines.append(f'# TYPE {preflight}_hosts gauge')
+            for outcome in ('resolved', 'nxdomain', 'failed'):
+                lines.append(f'{preflight}_hosts{{outcome="{outcome}"}} {self.dns_preflight[outcome]}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsCollector()
+_connection_timing = threading.local()  # 当前线程最近一次建连的各阶段耗时，由响应钩子取走
+
+
+def timed_call(func, queued_at: float, url: str, *args):
+    """在工作线程中执行检查函数，记录排队等待和总耗时"""
+    started = time.perf_counter()
+    METRICS.observe('queue', url, started - queued_at)
+    try:
+        return func(*args)
+    finally:
+        METRICS.observe('total', url, time.perf_counter() - started)
+
+
+_COUNTING_ADAPTER = None  # 首次创建 Session 时才定义的 HTTPAdapter 子类（定义时需要导入 requests）
+
+
+def build_counting_adapter(on_connect, **kwargs):
+    """
+    构造每当底层真正建立 TCP 连接时回调 on_connect 的 HTTPAdapter
+    同时把 DNS、TCP 连接、TLS 握手耗时记录到当前线程，供响应钩子统计
+    """
+    global _COUNTING_ADAPTER
+    if _COUNTING_ADAPTER is None:
+        class CountingAdapter(requests.adapters.HTTPAdapter):
+            def __init__(self, on_connect, **kwargs):
+                self._on_connect = on_connect
+                super().__init__(**kwargs)
+
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                on_connect = self._on_connect
+                pool_classes = {}
+                for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items():
+                    base_conn = pool_cls.ConnectionCls
+
+                    def new_conn(conn, _base=base_conn):
+                        # 先单独解析主机名以区分 DNS 和 TCP 连接耗时，再逐个尝试解析出的地址
+                        host = getattr(conn, '_origin_dns_host', None) or conn._dns_host
+                        conn._origin_dns_host = host
+                        started = time.perf_counter()
+                        try:
+                            addresses = resolve_host(host, conn.port)
+                        except OSError:
+                            # 解析失败时交给 urllib3 处理，以得到一致的异常类型
+                            return _base._new_conn(conn)
+                        resolved = time.perf_counter()
+
+                        error = None
+                        try:
+                            for address in addresses:
+                                conn._dns_host = address
+                                try:
+                                    sock = _base._new_conn(conn)
+                                    break
+                                except Exception as e:
+                                    error = e
+                            else:
+                                raise error
+                        finally:
+                            conn._dns_host = host
+
+                        _connection_timing.phases = {
+                            'dns': resolved - started,
+                            'connect': time.perf_counter() - resolved,
+                        }
+                        return sock
+
+                    def connect(conn, _base=base_conn, _scheme=scheme):
+                        _connection_timing.phases = {}
+                        started = time.perf_counter()
+                        _base.connect(conn)
+                        phases = getattr(_connection_timing, 'phases', {})
+                        if _scheme == 'https':
+                            phases['tls'] = max(time.perf_counter() - started - sum(phases.values()), 0.0)
+                        on_connect()
+
+                    conn_cls = type(base_conn.__name__, (base_conn,), {'connect': connect, '_new_conn': new_conn})
+                    pool_classes[scheme] = type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': conn_cls})
+                self.poolmanager.pool_classes_by_scheme = pool_classes
+
+        _COUNTING_ADAPTER = CountingAdapter
+    return _COUNTING_ADAPTER(on_connect, **kwargs)
+
+
+# 表示域名不存在的 getaddrinfo 错误码；EAI_AGAIN 等暂时性失败不在其中，不会被缓存
+NXDOMAIN_ERRORS = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+
+class DNSCache:
+    """
+    线程共享、带 TTL 的 DNS 解析缓存
+    成功结果缓存 ttl 秒，域名不存在缓存 negative_ttl 秒；暂时性解析失败不缓存，下次重新解析。
+    线程引擎的连接层和 aiohttp 解析器都从这里取地址，预解析后请求阶段不再逐个阻塞在 DNS 上
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, negative_ttl: float = DNS_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # host -> (过期时间, [(family, 地址)])，域名不存在时地址列表为 None
+        self._entries: Dict[str, Tuple[float, List[Tuple[int, str]]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, host: str) -> List[Tuple[int, str]]:
+        """只查缓存：命中返回 [(family, 地址)]，未命中返回 None；缓存为域名不存在时抛出 socket.gaierror"""
+        host = host.lower()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            self.hits += 1
+        if entry[1] is None:
+            raise socket.gaierror(socket.EAI_NONAME, f'域名不存在: {host}')
+        return entry[1]
+
+    def resolve(self, host: str) -> List[Tuple[int, str]]:
+        """解析主机名，返回去重后的 [(family, 地址)]（保持系统返回的优先顺序）"""
+        cached = self.peek(host)
+        if cached is not None:
+            return cached
+        host = host.lower()
+        with self._lock:
+            self.misses += 1
+        try:
+            infos = socket.getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in NXDOMAIN_ERRORS:
+                with self._lock:
+                    self._entries[host] = (time.monotonic() + self.negative_ttl, None)
+            raise
+        addresses = list(dict.fromkeys((info[0], info[4][0]) for info in infos))
+        with self._lock:
+            self._entries[host] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def is_nxdomain(self, host: str) -> bool:
+        """缓存中是否记录该主机不存在（不触发解析）"""
+        try:
+            self.peek(host)
+        except socket.gaierror:
+            return True
+        return False
+
+    def preflight(self, hosts: List[str], max_workers: int = DNS_PREFLIGHT_WORKERS) -> Dict:
+        """
+        并行解析所有主机名，预先填充缓存
+        返回 {'hosts', 'resolved', 'nxdomain', 'failed', 'seconds'}
+        """
+        hosts = list(dict.fromkeys(host.lower() for host in hosts if host))
+        stats = {'hosts': len(hosts), 'resolved': 0, 'nxdomain': 0, 'failed': 0, 'seconds': 0.0}
+        started = time.perf_counter()
+        
+        def resolve(host: str) -> str:
+            try:
+                self.resolve(host)
+                return 'resolved'
+            except socket.gaierror as e:
+                return 'nxdomain' if e.errno in NXDOMAIN_ERRORS else 'failed'
+            except (OSError, UnicodeError):
+                return 'failed'
+        
+        if hosts:
+            with futures.ThreadPoolExecutor(max_workers=min(max_workers, len(hosts))) as executor:
+                for outcome in executor.map(resolve, hosts):
+                    stats[outcome] += 1
+        stats['seconds'] = time.perf_counter() - started
+        return stats
+
+
+DNS_CACHE = DNSCache()
+
+
+def resolve_host(host: str, port: int) -> List[str]:
+    """解析主机名，返回去重后的地址列表（保持系统返回的优先顺序，经 DNS_CACHE 缓存）"""
+    return [address for _, address in DNS_CACHE.resolve(host)]
+
+
+class SessionManager:
+    """
+    按主机复用的 requests.Session 管理器
+    同一主机的所有请求共享一个带连接池的 Session，避免重复 TCP+TLS 握手
+    """
+
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE, keep_alive: bool = KEEP_ALIVE):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+
+    def _observe_response(self, response, *args, **kwargs):
+        """响应钩子：统计请求数和各阶段耗时"""
+        with self._lock:
+            self._requests += 1
+        
+        # 本次请求如新建了连接，连接耗时记录在当前线程中
+        phases = getattr(_connection_timing, 'phases', None) or {}
+        _connection_timing.phases = None
+        METRICS.observe_connection(response.request.url, phases, response.elapsed.total_seconds())
+
+    def _count_connection(self):
+        with self._lock:
+            self._connections += 1
+
+    def get(self, url: str) -> requests.Session:
+        """获取 URL 所属主机的 Session（线程安全）"""
+        host = urlparse(url).netloc.lower()
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+        
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = build_counting_adapter(self._count_connection,
+                                                 pool_connections=self.pool_connections,
+                                                 pool_maxsize=self.pool_maxsize)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.hooks['response'].append(self._observe_response)
+                if not self.keep_alive:
+                    session.headers['Connection'] = 'close'
+                self._sessions[host] = session
+        return session
+
+    def stats(self) -> Dict:
+        """
+        统计连接复用情况
+        返回: {'hosts', 'requests', 'new_connections', 'reused_connections'}
+        """
+        with self._lock:
+            return {
+                'hosts': len(self._sessions),
+                'requests': self._requests,
+                'new_connections': self._connections,
+                'reused_connections': max(self._requests - self._connections, 0),
+            }
+
+    def close(self):
+        """关闭所有 Session 及其连接"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+SESSION_MANAGER = SessionManager()
+
+
+def get_session(url: str) -> requests.Session:
+    """获取全局 SessionManager 中 URL 对应主机的 Session"""
+    return SESSION_MANAGER.get(url)
+
+
+class ResultCache:
+    """
+    基于 SQLite 的持久化结果缓存
+    以 (类型, 键) 存储检查结果及 ETag/Last-Modified：
+    - 未过期的条目直接复用，不发请求
+    - 已过期的条目带 If-None-Match/If-Modified-Since 重新验证，304 时沿用旧结果
+    """
+
+    def __init__(self, path: str = CACHE_FILE, ttl: Dict[str, int] = None, max_age: int = None):
+        self.path = path
+        self.ttl = dict(CACHE_TTL if ttl is None else ttl)
+        self.max_age = max_age
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' kind TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' checked_at REAL NOT NULL,'
+            ' PRIMARY KEY (kind, key))'
+        )
+        self._conn.commit()
+
+    def ttl_for(self, status: str) -> int:
+        """返回某状态的有效期；--max-age 作为所有状态的上限"""
+        ttl = self.ttl.get(status, 0)
+        if self.max_age is not None:
+            ttl = min(ttl, self.max_age)
+        return ttl
+
+    def lookup(self, kind: str, key: str) -> Dict:
+        """
+        查询缓存
+        返回: None 或 {'result', 'etag', 'last_modified', 'fresh'}
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, etag, last_modified, checked_at FROM results WHERE kind = ? AND key = ?',
+                (kind, key)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        
+        result = json.loads(row[0])
+        fresh = time.time() - row[3] < self.ttl_for(result.get('status'))
+        if fresh:
+            self.hits += 1
+        return {'result': result, 'etag': row[1], 'last_modified': row[2], 'fresh': fresh}
+
+    def store(self, kind: str, key: str, result: Dict, response_headers=None):
+        """写入结果；不可缓存的状态会被忽略"""
+        if self.ttl.get(result.get('status'), 0) <= 0:
+            return
+        
+        headers = response_headers or {}
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, key, json.dumps(dict(result), ensure_ascii=False),
+                 headers.get('ETag'), headers.get('Last-Modified'), time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, kind: str, key: str):
+        """收到 304 后刷新条目的检查时间"""
+        self.revalidated += 1
+        with self._lock:
+            self._conn.execute('UPDATE results SET checked_at = ? WHERE kind = ? AND key = ?',
+                               (time.time(), kind, key))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+RESULT_CACHE = None  # 由 main() 根据 --no-cache 初始化
+
+
+class HistoryStore:
+    """
+    基于 SQLite 的仓库健康历史记录（只追加）
+    每次运行一行 runs，每个仓库每次运行一行 samples；
+    samples 以 (仓库, 运行) 为主键且不带 rowid，同一仓库的记录在磁盘上连续存放，
+    按仓库比较两个时间点只需两次主键查找
+    """
+
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS runs ('
+            ' id INTEGER PRIMARY KEY,'
+            ' started_at REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS repos ('
+            ' id INTEGER PRIMARY KEY,'
+            ' key TEXT NOT NULL UNIQUE);'
+            'CREATE TABLE IF NOT EXISTS samples ('
+            ' repo_id INTEGER NOT NULL,'
+            ' run_id INTEGER NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' stars INTEGER,'
+            ' forks INTEGER,'
+            ' pushed_at TEXT,'
+            ' days_since_update INTEGER,'
+            ' latest_release TEXT,'
+            ' release_known INTEGER NOT NULL DEFAULT 1,'
+            ' PRIMARY KEY (repo_id, run_id)) WITHOUT ROWID;'
+        )
+        # 早期的历史文件没有 release_known 列，补上（原有记录视为版本已确认）
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(samples)')}
+        if 'release_known' not in columns:
+            self._conn.execute('ALTER TABLE samples ADD COLUMN release_known INTEGER NOT NULL DEFAULT 1')
+        self._conn.commit()
+
+    def _repo_id(self, key: str) -> int:
+        self._conn.execute('INSERT OR IGNORE INTO repos (key) VALUES (?)', (key,))
+        return self._conn.execute('SELECT id FROM repos WHERE key = ?', (key,)).fetchone()[0]
+
+    def record_run(self, repo_results: List[Dict]) -> int:
+        """
+        追加一次运行的仓库结果，返回运行编号
+        取自未过期缓存的结果（from_cache）不是新的观测，跳过；全部跳过时不新建运行，返回 None
+        """
+        repo_results = [r for r in repo_results if not getattr(r, 'from_cache', False)]
+        if not repo_results:
+            return None
+        with self._lock:
+            run_id = self._conn.execute('INSERT INTO runs (started_at) VALUES (?)', (time.time(),)).lastrowid
+            for result in repo_results:
+                key = history_key(result['url'])
+                if key is None:
+                    continue
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (self._repo_id(key), run_id, result['status'], result.get('stars'), result.get('forks'),
+                     result.get('pushed_at'), result.get('days_since_update'),
+                     result.get('latest_release'), 'latest_release' in result)
+                )
+            self._conn.commit()
+        return run_id
+
+    def release_for(self, key: str, pushed_at: str) -> Tuple[str]:
+        """
+        查找同一 pushed_at 时记录的最新版本（只使用版本已确认的记录）
+        仓库此后没有推送时版本不会变化，可以跳过 releases/latest 请求
+        返回: None（无记录）或 (版本号,)，版本号可能为 None（没有 release）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT s.latest_release FROM samples s JOIN repos r ON r.id = s.repo_id'
+                ' WHERE r.key = ? AND s.pushed_at = ? AND s.release_known ORDER BY s.run_id DESC LIMIT 1',
+                (key, pushed_at)
+            ).fetchone()
+        return row
+
+    def knows_release(self, key: str) -> bool:
+        """是否记录过该仓库已确认的版本（用于预估请求数，不检查 pushed_at）"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM samples s JOIN repos r ON r.id = s.repo_id'
+                ' WHERE r.key = ? AND s.release_known LIMIT 1',
+                (key,)
+            ).fetchone()
+        return row is not None
+
+    def compare(self, days: int) -> List[Dict]:
+        """
+        将每个仓库的最新记录与 days 天前的记录比较
+        基准为截止时间之前的最后一条记录；没有更早的记录时取区间内最早的一条
+        """
+        cutoff = time.time() - days * 86400
+        with self._lock:
+            rows = self._conn.execute(
+                'WITH bounds AS ('
+                ' SELECT s.repo_id,'
+                '  COALESCE(MAX(CASE WHEN r.started_at <= ? THEN s.run_id END), MIN(s.run_id)) AS old_run,'
+                '  MAX(s.run_id) AS new_run'
+                ' FROM samples s JOIN runs r ON r.id = s.run_id GROUP BY s.repo_id)'
+                ' SELECT k.key, ro.started_at, o.status, o.stars, o.forks,'
+                '  n.status, n.stars, n.forks, n.pushed_at'
+                ' FROM bounds b'
+                ' JOIN repos k ON k.id = b.repo_id'
+                ' JOIN runs ro ON ro.id = b.old_run'
+                ' JOIN samples o ON o.repo_id = b.repo_id AND o.run_id = b.old_run'
+                ' JOIN samples n ON n.repo_id = b.repo_id AND n.run_id = b.new_run',
+                (cutoff,)
+            ).fetchall()
+        
+        comparisons = []
+        for key, since, old_status, old_stars, old_forks, status, stars, forks, pushed_at in rows:
+            comparisons.append({
+                'repo': key,
+                'since': datetime.fromtimestamp(since).strftime('%Y-%m-%d'),
+                'baseline_complete': since <= cutoff,
+                'old_status': old_status,
+                'status': status,
+                'stars': stars,
+                'stars_delta': stars - old_stars if stars is not None and old_stars is not None else None,
+                'forks_delta': forks - old_forks if forks is not None and old_forks is not None else None,
+                'pushed_at': pushed_at,
+            })
+        return comparisons
+
+    def star_growth(self, days: int = HISTORY_TREND_DAYS) -> List[Dict]:
+        """days 天内的 Stars 增长，按增长数降序"""
+        rows = [c for c in self.compare(days) if c['stars_delta'] is not None]
+        return sorted(rows, key=lambda c: c['stars_delta'], reverse=True)
+
+    def went_inactive(self, days: int = HISTORY_STATUS_DAYS) -> List[Dict]:
+        """days 天前还活跃、现在不活跃（或已归档、不存在）的仓库"""
+        return [c for c in self.compare(days)
+                if c['baseline_complete'] and c['old_status'] == 'active'
+                and c['status'] in ('inactive', 'archived', 'not_found')]
+
+    def trends(self, trend_days: int = HISTORY_TREND_DAYS,
+               status_days: int = HISTORY_STATUS_DAYS) -> Dict[str, Dict]:
+        """HTML 报告中的趋势列：{仓库键: {'stars_delta', 'since', 'old_status'}}"""
+        trends = {c['repo']: {'stars_delta': c['stars_delta'], 'since': c['since'], 'old_status': None}
+                  for c in self.compare(trend_days)}
+        for c in self.compare(status_days):
+            if c['baseline_complete'] and c['old_status'] != c['status'] and c['repo'] in trends:
+                trends[c['repo']]['old_status'] = c['old_status']
+        return trends
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+HISTORY = None  # 由 main() 根据 --no-history 初始化
+
+
+def history_key(url: str) -> str:
+    """历史记录中仓库的键：小写的 owner/repo，无法解析时返回 None"""
+    parsed = parse_github_url(url)
+    return f'{parsed[0]}/{parsed[1]}'.lower() if parsed else None
+
+
+class RateLimitScheduler:
+    """
+    GitHub API 速率限制感知调度器
+    从每个响应读取 X-RateLimit-Remaining/X-RateLimit-Reset/Retry-After：
+    - 配额充足时不限速，尽快完成
+    - 配额不足以完成剩余请求时，把剩余配额均匀分布到重置时间之前
+    - 配额用尽或触发次级速率限制时暂停，到期后自动恢复
+    - 从第一次等待起累计超过 max_wait 秒后不再等待，需要等待的请求直接放弃
+    """
+
+    def __init__(self, reserve: int = RATE_LIMIT_RESERVE, max_wait: float = RATE_LIMIT_MAX_WAIT):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.remaining = None
+        self.reset_at = None
+        self.expected = 0
+        self.paused_until = 0.0
+        self.next_slot = 0.0
+        self.wait_started = None
+        self.pacing = False
+        self.gave_up = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def expect(self, requests_count: int):
+        """登记本次运行预计还需发送的请求数"""
+        with self._cond:
+            self.expected += requests_count
+
+    def track(self):
+        """开始统计当前线程发送的请求数，配合 settle 使用"""
+        self._local.sent = 0
+
+    def settle(self, expected: int):
+        """当前线程的任务完成：预计的 expected 次请求中没有发送的部分不再计入剩余请求"""
+        unused = expected - getattr(self._local, 'sent', 0)
+        if unused > 0:
+            with self._cond:
+                self.expected = max(self.expected - unused, 0)
+
+    def reset_wait(self):
+        """重新开始计算累计等待时间（监视模式每轮调用）"""
+        with self._cond:
+            self.wait_started = None
+            self.gave_up = False
+
+    def _interval(self, now: float) -> float:
+        if self.remaining is None or self.reset_at is None:
+            return 0.0
+        budget = self.remaining - self.reserve
+        if budget >= self.expected:
+            return 0.0
+        return max(self.reset_at - now, 0.0) / max(budget, 1)
+
+    def acquire(self) -> bool:
+        """
+        在发送请求前调用，必要时阻塞等待
+        返回 False 表示需要等待的时间超出 max_wait 上限，调用方应放弃该请求
+        """
+        with self._cond:
+            while True:
+                now = time.time()
+                wait = max(self.paused_until, self.next_slot) - now
+                if wait <= 0:
+                    break
+                if self.wait_started is None:
+                    self.wait_started = now
+                if self.max_wait and now + wait > self.wait_started + self.max_wait:
+                    if not self.gave_up:
+                        self.gave_up = True
+                        print(f"{Colors.YELLOW}⏹ 等待 GitHub API 配额将超过 {self.max_wait:g} 秒上限"
+                              f"（--max-rate-wait），剩余仓库标记为 rate_limit{Colors.END}")
+                    return False
+                self._cond.wait(wait)
+            interval = self._interval(now)
+            if interval > 0 and not self.pacing:
+                print(f"{Colors.YELLOW}⏱ GitHub API 可用配额 {max(self.remaining - self.reserve, 0)} 次"
+                      f"（保留 {self.reserve} 次），不足以完成预计的 {self.expected} 次请求，"
+                      f"放慢为每 {interval:.1f} 秒一次（设置 GITHUB_TOKEN 可提高配额）{Colors.END}")
+            self.pacing = interval > 0
+            self.next_slot = now + interval
+            self.expected = max(self.expected - 1, 0)
+            self._local.sent = getattr(self._local, 'sent', 0) + 1
+            return True
+
+    def _pause(self, until: float, reason: str):
+        if until > self.paused_until:
+            self.paused_until = until
+            print(f"{Colors.YELLOW}⏸ {reason}，暂停 {int(until - time.time()) + 1} 秒后继续...{Colors.END}")
+
+    def observe(self, response) -> str:
+        """
+        根据响应头更新配额状态
+        返回: 'ok' | 'rate_limit' (主配额用尽) | 'secondary_rate_limit' (次级限制) | 'forbidden' (普通 403)
+        """
+        headers = response.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        retry_after = headers.get('Retry-After')
+        now = time.time()
+        
+        with self._cond:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+            
+            kind = 'ok'
+            if response.status_code in (403, 429):
+                if retry_after is not None:
+                    kind = 'secondary_rate_limit'
+                    self._pause(now + float(retry_after), '触发 GitHub 次级速率限制')
+                elif remaining == '0':
+                    kind = 'rate_limit'
+                    self._pause((self.reset_at or now + 60) + 1, 'GitHub API 配额已用尽')
+                elif response.status_code == 429 or 'secondary rate limit' in response.text.lower():
+                    kind = 'secondary_rate_limit'
+                    self._pause(now + 60, '触发 GitHub 次级速率限制')
+                else:
+                    kind = 'forbidden'
+            elif self.remaining is not None and self.remaining <= self.reserve and self.reset_at:
+                self._pause(self.reset_at + 1, 'GitHub API 配额即将用尽')
+            
+            self._cond.notify_all()
+        return kind
+
+
+GITHUB_SCHEDULER = RateLimitScheduler()
+
+
+def github_request(session: requests.Session, method: str, url: str, **kwargs):
+    """
+    经调度器发送 GitHub API 请求，遇到速率限制时暂停后重试
+    返回: (response, kind)，kind 含义见 RateLimitScheduler.observe；
+    等待超过 --max-rate-wait 上限而未发出请求时返回 (None, 'rate_limit')
+    """
+    response, kind = None, 'rate_limit'
+    for _ in range(GITHUB_MAX_RETRIES + 1):
+        if not GITHUB_SCHEDULER.acquire():
+            break
+        response = session.request(method, url, timeout=TIMEOUT, **kwargs)
+        kind = GITHUB_SCHEDULER.observe(response)
+        if kind not in ('rate_limit', 'secondary_rate_limit'):
+            break
+    return response, kind
+
+
+def conditional_headers(cached: Dict) -> Dict:
+    """根据缓存条目构造条件请求头"""
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+    return headers
+
+
+# Markdown 链接格式: [text](url)
+LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^\)]+)\)')
+# 表格行中的 GitHub 链接: | 名称 | [GitHub](https://github.com/owner/repo) |
+REPO_ROW_PATTERN = re.compile(r'\|\s*([^|]+?)\s*\|\s*\[([^\]]+)\]\((https://github\.com/[^)]+)\)')
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+
+
+class MarkdownItem(NamedTuple):
+    """从 Markdown 中提取的一条链接或仓库"""
+    kind: str  # 'link' 或 'repo'
+    text: str  # 链接文本；仓库条目为工具名称
+    url: str
+    source: str  # 所在文件
+    line: int  # 所在行号
+
+    @property
+    def location(self) -> str:
+        return f'{self.source}:{self.line}'
+
+
+def iter_markdown_files(inputs: List[str]) -> Iterator[str]:
+    """
+    展开输入参数，支持文件、目录（递归查找 .md/.markdown）和 glob 通配符
+    每个文件只返回一次
+    """
+    seen = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            candidates = []
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                candidates.extend(os.path.join(root, name) for name in sorted(files)
+                                  if name.lower().endswith(MARKDOWN_EXTENSIONS))
+        elif glob.has_magic(pattern):
+            candidates = sorted(glob.glob(pattern, recursive=True))
+        else:
+            candidates = [pattern]
+        
+        for path in candidates:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                yield path
+
+
+def extract_markdown(inputs: List[str]) -> Iterator[MarkdownItem]:
+    """
+    单遍流式提取：逐行读取所有输入文件，同时产出通用链接和表格中的 GitHub 仓库
+    不会把整个文件读入内存
+    """
+    for path in iter_markdown_files(inputs):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if '](' not in line:
+                    continue
+                
+                for text, url in LINK_PATTERN.findall(line):
+                    # 跳过锚点链接和本地文件链接
+                    if url.startswith(('http://', 'https://')):
+                        yield MarkdownItem('link', text, url, path, line_no)
+                
+                if '|' in line and 'github.com' in line:
+                    for tool_name, _, url in REPO_ROW_PATTERN.findall(line):
+                        yield MarkdownItem('repo', tool_name.strip(), url.strip(), path, line_no)
+
+
+class ExtractedItems(NamedTuple):
+    """一次提取的结果"""
+    link_index: 'LinkIndex'
+    repos: List[Tuple[str, str]]  # 按出现顺序，可能重复
+    repo_locations: Dict[Tuple[str, str], List[str]]
+    link_order: Dict[Tuple[str, str], int]  # 首次出现序号，分片合并时用于恢复原始顺序
+    repo_order: Dict[Tuple[str, str], int]
+
+
+def collect_items(inputs: List[str], shard: Tuple[int, int] = None) -> ExtractedItems:
+    """单遍提取所有输入文件中的链接和仓库；指定分片时只保留属于该分片的条目"""
+    items = ExtractedItems(LinkIndex(), [], {}, {}, {})
+    for seq, item in enumerate(extract_markdown(inputs)):
+        if shard and not in_shard(shard_key(item.url), shard):
+            continue
+        key = (item.text, item.url)
+        if item.kind == 'link':
+            items.link_index.add(item.text, item.url, item.location)
+            items.link_order.setdefault(key, seq)
+        else:
+            items.repos.append(key)
+            items.repo_locations.setdefault(key, []).append(item.location)
+            items.repo_order.setdefault(key, seq)
+    return items
+
+
+def extract_all_links(file_path: str) -> List[Tuple[str, str]]:
+    """
+    从 Markdown 文件中提取所有链接
+    返回: [(链接文本, URL), ...]
+    """
+    return [(item.text, item.url) for item in extract_markdown([file_path]) if item.kind == 'link']
+
+
+def extract_github_repos(file_path: str) -> List[Tuple[str, str]]:
+    """
+    从 Markdown 文件中提取 GitHub 仓库链接
+    返回: [(工具名称, GitHub URL), ...]
+    """
+    return [(item.text, item.url) for item in extract_markdown([file_path]) if item.kind == 'repo']
+
+
+def normalize_url(url: str) -> str:
+    """标准化 URL"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化 URL，用于识别指向同一目标的不同写法：
+    http/https、www. 前缀、默认端口、#fragment 和末尾斜杠均视为相同
+    """
+    parts = urlsplit(normalize_url(url.strip()))
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    path = parts.path.rstrip('/')
+    return urlunsplit(('https', host, path, parts.query, ''))
+
+
+class LinkIndex:
+    """
+    规范化 URL 索引
+    记录每个规范化目标对应的所有出现 (链接文本, 原始 URL, 位置)，
+    使每个目标只检查一次，再把结果分发回所有出现
+    """
+
+    def __init__(self):
+        self._pairs: Dict[Tuple[str, str], List[str]] = {}
+        self._canonical: Dict[Tuple[str, str], str] = {}
+
+    def add(self, text: str, url: str, location: str):
+        key = (text, url)
+        if key not in self._pairs:
+            self._pairs[key] = []
+            self._canonical[key] = canonicalize_url(url)
+        self._pairs[key].append(location)
+
+    def pairs(self) -> Dict[Tuple[str, str], List[str]]:
+        """返回 {(链接文本, URL): [位置, ...]}，按首次出现排序"""
+        return self._pairs
+
+    def canonical(self, text: str, url: str) -> str:
+        return self._canonical[(text, url)]
+
+    def targets(self, pairs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """每个规范化目标取首次出现的 (链接文本, URL) 作为代表"""
+        seen = {}
+        for text, url in pairs:
+            seen.setdefault(self._canonical[(text, url)], (text, url))
+        return list(seen.values())
+
+    def group(self, pairs: List[Tuple[str, str]]) -> Dict[str, List[Tuple[str, str]]]:
+        """按规范化目标分组：{目标: [(链接文本, URL), ...]}，用于逐条分发结果"""
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        for pair in pairs:
+            groups.setdefault(self._canonical[pair], []).append(pair)
+        return groups
+
+    def fan_out(self, results: List[Dict], pairs: List[Tuple[str, str]]) -> List[Dict]:
+        """把按目标检查的结果分发回每个 (链接文本, URL)，并附上所在位置"""
+        by_target = {canonicalize_url(r['url']): r for r in results}
+        fanned = []
+        for text, url in pairs:
+            result = by_target.get(self._canonical[(text, url)])
+            if result is not None:
+                fanned.append(LinkResult.from_dict(result, text=text, url=url, locations=self._pairs[(text, url)]))
+        return fanned
+
+
+def repo_result_to_link_result(text: str, url: str, repo_result: Dict) -> LinkResult:
+    """
+    用 GitHub API 的仓库结果直接判定仓库主页链接
+    无法据此判定（如速率限制、请求错误）时返回 None
+    """
+    if repo_result['status'] in (Status.ACTIVE, Status.INACTIVE, Status.ARCHIVED):
+        return LinkResult(url=url, text=text, status=Status.SUCCESS, status_code=200, message='OK (GitHub API)')
+    elif repo_result['status'] == Status.NOT_FOUND:
+        return LinkResult(url=url, text=text, status=Status.ERROR, status_code=404,
+                          message=f"HTTP 404 ({repo_result['message']})")
+    return None
+
+
+class ResultAggregator:
+    """
+    汇总并行运行的链接检查和仓库检查的结果（线程安全）
+    仓库结果一到达就判定对应的 GitHub 仓库主页链接，同一 URL 不再单独请求；
+    仓库结果无法判定（或没有结果）的链接由 pending_links() 交回在线检查
+    """
+
+    def __init__(self, deferred_links: List[Tuple[str, str]] = (),
+                 on_link: Callable[[Dict], None] = None, on_repo: Callable[[Dict], None] = None):
+        self.link_results: List[Dict] = []
+        self.on_link = on_link
+        self.on_repo = on_repo
+        self._deferred: Dict[str, List[Tuple[str, str]]] = {}
+        self._unresolved: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        for text, url in deferred_links:
+            self._deferred.setdefault(canonicalize_url(url), []).append((text, url))
+
+    def add_link(self, result: Dict):
+        with self._lock:
+            self.link_results.append(result)
+        if self.on_link:
+            self.on_link(result)
+
+    def add_repo(self, result: Dict):
+        resolved = []
+        with self._lock:
+            for text, url in self._deferred.pop(canonicalize_url(result['url']), []):
+                link_result = repo_result_to_link_result(text, url, result)
+                if link_result is None:
+                    self._unresolved.append((text, url))
+                else:
+                    self.link_results.append(link_result)
+                    resolved.append(link_result)
+        if self.on_repo:
+            self.on_repo(result)
+        if self.on_link:
+            for link_result in resolved:
+                self.on_link(link_result)
+
+    def pending_links(self) -> List[Tuple[str, str]]:
+        """取出仍需在线检查的链接"""
+        with self._lock:
+            pending = self._unresolved + [pair for pairs in self._deferred.values() for pair in pairs]
+            self._unresolved = []
+            self._deferred = {}
+        return pending
+
+
+class CircuitBreaker:
+    """
+    按主机的熔断器
+    同一主机连续 threshold 个 URL 在重试用尽后仍网络失败（超时、连接失败）即熔断，
+    该主机其余的 URL 直接判定为主机不可达，不再等待超时。
+    熔断 cooldown 秒后进入半开状态：只放行一个探测请求，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_BREAKER_THRESHOLD, cooldown: float = CIRCUIT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}  # 熔断中的主机 -> 进入半开状态的时间
+        self._probing = set()  # 半开状态下正在探测的主机
+        self._lock = threading.Lock()
+
+    def allow(self, host: str, retry: bool = False) -> bool:
+        """
+        是否允许向该主机发请求，每次尝试前调用；半开状态下只有第一个调用者获得探测机会
+        retry 表示同一 URL 的重试，获得探测机会的 URL 重试时不会被自己的探测拦下
+        """
+        with self._lock:
+            open_until = self._open_until.get(host)
+            if open_until is None:
+                return True
+            if time.monotonic() < open_until:
+                return False
+            if host in self._probing:
+                return retry
+            self._probing.add(host)
+            return True
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._open_until.pop(host, None)
+            self._probing.discard(host)
+
+    def record_failure(self, host: str):
+        """记录一个 URL 在重试用尽后的网络失败"""
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if host in self._probing or (self.threshold > 0 and self._failures[host] >= self.threshold):
+                self._open_until[host] = time.monotonic() + self.cooldown
+            self._probing.discard(host)
+
+    def release(self, host: str):
+        """请求以非网络错误结束：不改变熔断状态，只让出半开探测机会"""
+        with self._lock:
+            self._probing.discard(host)
+
+    def open_hosts(self) -> List[str]:
+        with self._lock:
+            return sorted(self._open_until)
+
+    def reset(self):
+        """清除所有主机的失败计数和熔断状态"""
+        with self._lock:
+            self._failures.clear()
+            self._open_until.clear()
+            self._probing.clear()
+
+
+CIRCUIT_BREAKER = CircuitBreaker()
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """429 和 5xx 视为暂时性失败"""
+    return status_code == 429 or status_code >= 500
+
+
+def retry_delay(attempt: int, retry_after: str = None) -> float:
+    """
+    第 attempt 次重试前的等待时间：优先使用 Retry-After，
+    否则指数退避并加入全抖动，均不超过 RETRY_MAX_BACKOFF
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), RETRY_MAX_BACKOFF)
+        except ValueError:
+            pass
+    return random.uniform(0, min(RETRY_BACKOFF * (2 ** attempt), RETRY_MAX_BACKOFF))
+
+
+def link_error_result(url: str, text: str, message: str) -> LinkResult:
+    """构造没有状态码的链接错误结果"""
+    return LinkResult(url=url, text=text, status=Status.ERROR, status_code=None, message=message)
+
+
+def host_unreachable_result(url: str, text: str) -> LinkResult:
+    return link_error_result(url, text, f'主机不可达（连续 {CIRCUIT_BREAKER.threshold} 个 URL 连接失败，已熔断）')
+
+
+def nxdomain_result(url: str, text: str) -> LinkResult:
+    return link_error_result(url, text, '域名不存在（DNS 预解析）')
+
+
+HEAD_REJECTING_HOSTS = set()  # 不支持 HEAD 的主机，后续 URL 直接使用有限 GET
+_head_hosts_lock = threading.Lock()
+
+
+def remember_head_rejecting(url: str):
+    """记录 HEAD 失败但 GET 成功的主机"""
+    with _head_hosts_lock:
+        HEAD_REJECTING_HOSTS.add(urlparse(url).netloc.lower())
+
+
+def rejects_head(url: str) -> bool:
+    return urlparse(url).netloc.lower() in HEAD_REJECTING_HOSTS
+
+
+def fallback_headers(headers: Dict) -> Dict:
+    """有限 GET 的请求头：'range' 模式只请求第一个字节"""
+    if FALLBACK_MODE == 'range':
+        return {**headers, 'Range': 'bytes=0-0'}
+    return headers
+
+
+def bounded_get(session: requests.Session, url: str, headers: Dict) -> requests.Response:
+    """
+    有限 GET：流式请求，最多读取 FALLBACK_MAX_BYTES 字节后立即关闭连接，
+    只为获取状态码，不下载完整响应体
+    """
+    response = session.get(
+        url,
+        headers=fallback_headers(headers),
+        timeout=TIMEOUT,
+        allow_redirects=True,
+        stream=True
+    )
+    try:
+        if FALLBACK_MODE == 'stream' and FALLBACK_MAX_BYTES > 0:
+            next(response.iter_content(FALLBACK_MAX_BYTES), None)
+    finally:
+        response.close()
+    return response
+
+
+def build_link_result(url: str, text: str, status_code: int, final_url: str) -> LinkResult:
+    """根据最终状态码构造链接检查结果（同步与异步引擎共用）"""
+    # 206 来自 Range 请求，同样表示资源可访问
+    if status_code in (200, 206):
+        return LinkResult(url=url, text=text, status=Status.SUCCESS, status_code=status_code, message='OK')
+    elif 300 <= status_code < 400:
+        return LinkResult(url=url, text=text, status=Status.WARNING, status_code=status_code,
+                          message=f'重定向到: {final_url}')
+    else:
+        return LinkResult(url=url, text=text, status=Status.ERROR, status_code=status_code,
+                          message=f'HTTP {status_code}')
+
+
+def fetch_link(session: requests.Session, normalized_url: str, headers: Dict) -> requests.Response:
+    """发送一次链接检查请求：HEAD，失败时退回有限 GET"""
+    # 已知不支持 HEAD 的主机直接使用有限 GET
+    if rejects_head(normalized_url):
+        return bounded_get(session, normalized_url, headers)
+    
+    response = session.head(
+        normalized_url,
+        headers=headers,
+        timeout=TIMEOUT,
+        allow_redirects=True
+    )
+    
+    # 如果 HEAD 请求失败，尝试有限 GET 请求
+    if response.status_code >= 400:
+        response = bounded_get(session, normalized_url, headers)
+        if response.status_code < 400:
+            remember_head_rejecting(normalized_url)
+    return response
+
+
+def check_url(url: str, text: str) -> LinkResult:
+    """
+    检查单个 URL 是否有效
+    超时、连接失败、429 和 5xx 会按指数退避重试；主机熔断后直接返回不可达
+    """
+    normalized_url = normalize_url(url)
+    host = urlparse(normalized_url).netloc.lower()
+    
+    headers = {
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    }
+    
+    session = get_session(normalized_url)
+    
+    cache_key = canonicalize_url(url)
+    cached = RESULT_CACHE.lookup('link', cache_key) if RESULT_CACHE else None
+    if cached and cached['fresh']:
+        return LinkResult.from_dict(cached['result'], url=url, text=text)
+    headers.update(conditional_headers(cached))
+    
+    # 预解析已确认域名不存在，不再建立连接
+    if DNS_CACHE.is_nxdomain(urlparse(normalized_url).hostname or ''):
+        return nxdomain_result(url, text)
+    
+    for attempt in range(RETRY_ATTEMPTS + 1):
+        if not CIRCUIT_BREAKER.allow(host, retry=attempt > 0):
+            return host_unreachable_result(url, text)
+        
+        last_attempt = attempt == RETRY_ATTEMPTS
+        try:
+            response = fetch_link(session, normalized_url, headers)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if not last_attempt:
+                time.sleep(retry_delay(attempt))
+                continue
+            # 重试用尽才记为主机的一次失败，阈值对应连续失败的 URL 数
+            CIRCUIT_BREAKER.record_failure(host)
+            if isinstance(e, requests.exceptions.Timeout):
+                return link_error_result(url, text, '请求超时')
+            return link_error_result(url, text, '连接失败')
+        except Exception as e:
+            CIRCUIT_BREAKER.release(host)
+            return link_error_result(url, text, f'错误: {str(e)}')
+        
+        CIRCUIT_BREAKER.record_success(host)
+        if is_retryable_status(response.status_code) and not last_attempt:
+            time.sleep(retry_delay(attempt, response.headers.get('Retry-After')))
+            continue
+        break
+    
+    # 内容未变化，沿用缓存结果
+    if response.status_code == 304 and cached:
+        RESULT_CACHE.touch('link', cache_key)
+        return LinkResult.from_dict(cached['result'], url=url, text=text)
+    
+    result = build_link_result(url, text, response.status_code, response.url)
+    if RESULT_CACHE:
+        RESULT_CACHE.store('link', cache_key, result, response.headers)
+    return result
+
+
+def iter_link_results(links: List[Tuple[str, str]]) -> Iterator[LinkResult]:
+    """
+    并行检查链接，按完成顺序逐个产出结果
+    提前停止迭代时，尚未开始的检查会被取消
+    """
+    executor = futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        pending = [executor.submit(timed_call, check_url, time.perf_counter(), normalize_url(url), url, text)
+                   for text, url in links]
+        for future in futures.as_completed(pending):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def dns_preflight(links: List[Tuple[str, str]]) -> Dict:
+    """
+    HTTP 检查开始前并行解析所有链接的主机名，填充 DNS_CACHE 并记录耗时
+    配置了代理时由代理负责解析，本地结果不可靠，返回 None 跳过
+    """
+    from urllib.request import getproxies
+    
+    if any(scheme != 'no' for scheme in getproxies()):
+        return None
+    stats = DNS_CACHE.preflight([urlparse(normalize_url(url)).hostname for _, url in links])
+    METRICS.record_preflight(stats)
+    return stats
+
+
+def check_links_parallel(links: List[Tuple[str, str]], on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """并行检查所有链接；on_result 在每个结果完成时调用"""
+    results = []
+    for i, result in enumerate(iter_link_results(links), 1):
+        results.append(result)
+        if on_result:
+            on_result(result)
+        if SHOW_PROGRESS:
+            print_link_progress(i, len(links), result)
+    return results
+
+
+def print_link_progress(index: int, total: int, result: Dict):
+    """打印单条链接检查进度"""
+    status_symbol = {
+        'success': f'{Colors.GREEN}✓{Colors.END}',
+        'warning': f'{Colors.YELLOW}⚠{Colors.END}',
+        'error': f'{Colors.RED}✗{Colors.END}'
+    }
+    
+    print(f"[{index}/{total}] {status_symbol[result['status']]} {result['url']}")
+
+
+async def fetch_link_async(session, normalized_url: str, headers: Dict) -> Tuple[int, str, Dict]:
+    """异步发送一次链接检查请求：HEAD，失败时退回有限 GET；返回 (状态码, 最终 URL, 响应头)"""
+    status_code = None
+    if not rejects_head(normalized_url):
+        async with session.head(normalized_url, headers=headers, allow_redirects=True) as response:
+            status_code = response.status
+            final_url = str(response.url)
+            response_headers = response.headers
+    
+    # HEAD 失败或主机不支持 HEAD 时，使用有限 GET（未读完的连接退出时直接关闭）
+    if status_code is None or status_code >= 400:
+        async with session.get(normalized_url, headers=fallback_headers(headers),
+                               allow_redirects=True) as response:
+            if FALLBACK_MODE == 'stream' and FALLBACK_MAX_BYTES > 0:
+                await response.content.read(FALLBACK_MAX_BYTES)
+            if status_code is not None and response.status < 400:
+                remember_head_rejecting(normalized_url)
+            status_code = response.status
+            final_url = str(response.url)
+            response_headers = response.headers
+    
+    return status_code, final_url, response_headers
+
+
+async def check_url_async(session, url: str, text: str,
+                          global_semaphore: asyncio.Semaphore,
+                          host_semaphores: Dict[str, asyncio.Semaphore],
+                          per_host_limit: int) -> Dict:
+    """
+    使用 aiohttp 异步检查单个 URL，结果格式、重试和熔断策略与 check_url 一致
+    """
+    normalized_url = normalize_url(url)
+    host = urlparse(normalized_url).netloc.lower()
+    if host not in host_semaphores:
+        host_semaphores[host] = asyncio.Semaphore(per_host_limit)
+    
+    headers = {
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    }
+    
+    cache_key = canonicalize_url(url)
+    cached = RESULT_CACHE.lookup('link', cache_key) if RESULT_CACHE else None
+    if cached and cached['fresh']:
+        return LinkResult.from_dict(cached['result'], url=url, text=text)
+    headers.update(conditional_headers(cached))
+    
+    # 预解析已确认域名不存在，不再建立连接
+    if DNS_CACHE.is_nxdomain(urlparse(normalized_url).hostname or ''):
+        return nxdomain_result(url, text)
+    
+    # 同一 URL 的重试期间一直占着主机名额：否则每次重试都要排到该主机其他 URL 之后，
+    # 重试用尽（记一次熔断失败）要等到几乎所有 URL 都试过一轮，熔断形同虚设
+    waiting = time.perf_counter()
+    async with host_semaphores[host]:
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            last_attempt = attempt == RETRY_ATTEMPTS
+            # 拿到主机名额后、每次尝试前判断熔断：排队期间主机可能已被熔断
+            if not CIRCUIT_BREAKER.allow(host, retry=attempt > 0):
+                return host_unreachable_result(url, text)
+            try:
+                # 全局名额只在请求期间占用，退避等待不阻塞其他主机
+                async with global_semaphore:
+                    METRICS.observe('queue', normalized_url, time.perf_counter() - waiting)
+                    status_code, final_url, response_headers = await fetch_link_async(
+                        session, normalized_url, headers)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                if not last_attempt:
+                    await asyncio.sleep(retry_delay(attempt))
+                    waiting = time.perf_counter()
+                    continue
+                # 重试用尽才记为主机的一次失败，阈值对应连续失败的 URL 数
+                CIRCUIT_BREAKER.record_failure(host)
+                if isinstance(e, asyncio.TimeoutError):
+                    return link_error_result(url, text, '请求超时')
+                return link_error_result(url, text, '连接失败')
+            except asyncio.CancelledError:
+                # 提前停止迭代时任务被取消，让出可能持有的半开探测机会
+                CIRCUIT_BREAKER.release(host)
+                raise
+            except Exception as e:
+                CIRCUIT_BREAKER.release(host)
+                return link_error_result(url, text, f'错误: {str(e)}')
+            
+            CIRCUIT_BREAKER.record_success(host)
+            if is_retryable_status(status_code) and not last_attempt:
+                await asyncio.sleep(retry_delay(attempt, response_headers.get('Retry-After')))
+                waiting = time.perf_counter()
+                continue
+            break
+    
+    # 内容未变化，沿用缓存结果
+    if status_code == 304 and cached:
+        RESULT_CACHE.touch('link', cache_key)
+        return LinkResult.from_dict(cached['result'], url=url, text=text)
+    
+    result = build_link_result(url, text, status_code, final_url)
+    if RESULT_CACHE:
+        RESULT_CACHE.store('link', cache_key, result, response_headers)
+    return result
+
+
+def build_trace_config():
+    """
+    aiohttp 请求追踪：记录 DNS、建连和首字节耗时
+    aiohttp 不单独暴露 TLS 握手事件，HTTPS 的 connect 阶段包含 TLS
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+        ctx.phases = {}
+
+    async def on_dns_start(session, ctx, params):
+        ctx.dns_started = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        ctx.phases['dns'] = time.perf_counter() - ctx.dns_started
+
+    async def on_connection_start(session, ctx, params):
+        ctx.connection_started = time.perf_counter()
+
+    async def on_connection_end(session, ctx, params):
+        elapsed = time.perf_counter() - ctx.connection_started
+        ctx.phases['connect'] = max(elapsed - ctx.phases.get('dns', 0.0), 0.0)
+
+    async def on_request_end(session, ctx, params):
+        METRICS.observe_connection(str(params.url), ctx.phases, time.perf_counter() - ctx.started)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connection_start)
+    trace_config.on_connection_create_end.append(on_connection_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def build_dns_resolver():
+    """
+    aiohttp 解析器：与线程引擎共用 DNS_CACHE
+    缓存命中时直接返回，未命中时在默认线程池中解析并写入缓存
+    """
+    class CachedResolver(aiohttp.abc.AbstractResolver):
+        async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict]:
+            addresses = DNS_CACHE.peek(host)
+            if addresses is None:
+                addresses = await asyncio.get_running_loop().run_in_executor(None, DNS_CACHE.resolve, host)
+            results = [
+                {'hostname': host, 'host': address, 'port': port, 'family': address_family,
+                 'proto': 0, 'flags': socket.AI_NUMERICHOST | socket.AI_NUMERICSERV}
+                for address_family, address in addresses
+                if family in (socket.AF_UNSPEC, address_family)
+            ]
+            if not results:
+                raise OSError(None, f'没有可用的地址: {host}')
+            return results
+
+        async def close(self):
+            pass
+
+    return CachedResolver()
+
+
+async def aiter_link_results(links: List[Tuple[str, str]],
+                             max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                             per_host_limit: int = ASYNC_PER_HOST_LIMIT) -> AsyncIterator[LinkResult]:
+    """
+    异步引擎：全局并发上限 + 单主机信号量，按完成顺序逐个产出结果
+    需要安装 aiohttp；提前停止迭代时取消尚未完成的检查
+    """
+    if aiohttp is None:
+        raise RuntimeError('异步引擎需要 aiohttp，请先执行: pip install aiohttp')
+    
+    global_semaphore = asyncio.Semaphore(max_concurrency)
+    host_semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    async def timed_check(session, url: str, text: str) -> Dict:
+        started = time.perf_counter()
+        try:
+            return await check_url_async(session, url, text, global_semaphore,
+                                         host_semaphores, per_host_limit)
+        finally:
+            METRICS.observe('total', normalize_url(url), time.perf_counter() - started)
+    
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=max_concurrency, limit_per_host=per_host_limit,
+                                     resolver=build_dns_resolver(), use_dns_cache=False)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                     trace_configs=[build_trace_config()]) as session:
+        tasks = [asyncio.ensure_future(timed_check(session, url, text)) for text, url in links]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def _check_links_async(links: List[Tuple[str, str]], max_concurrency: int,
+                             per_host_limit: int, on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """异步引擎主体：收集 aiter_link_results 的结果并打印进度"""
+    results = []
+    i = 0
+    async for result in aiter_link_results(links, max_concurrency, per_host_limit):
+        i += 1
+        results.append(result)
+        if on_result:
+            on_result(result)
+        if SHOW_PROGRESS:
+            print_link_progress(i, len(links), result)
+    return results
+
+
+def check_links_async(links: List[Tuple[str, str]],
+                      max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                      per_host_limit: int = ASYNC_PER_HOST_LIMIT,
+                      on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """
+    使用 asyncio 引擎并发检查所有链接
+    需要安装 aiohttp；返回结果和 on_result 回调与 check_links_parallel 相同
+    """
+    if aiohttp is None:
+        raise RuntimeError('异步引擎需要 aiohttp，请先执行: pip install aiohttp')
+    
+    return asyncio.run(_check_links_async(links, max_concurrency, per_host_limit, on_result))
+
+
+def check_github_repo(owner: str, repo: str) -> RepoResult:
+    """检查 GitHub 仓库状态"""
+    headers = {'User-Agent': USER_AGENT}
+    if GITHUB_TOKEN:
+        headers['Authorization'] = f'token {GITHUB_TOKEN}'
+    
+    cache_key = f'{owner}/{repo}'.lower()
+    cached = RESULT_CACHE.lookup('repo', cache_key) if RESULT_CACHE else None
+    if cached and cached['fresh']:
+        result = refresh_repo_result(cached['result'])
+        result.from_cache = True
+        return result
+    
+    try:
+        # 获取仓库基本信息（带条件请求头，304 不消耗 API 配额）
+        api_url = f'{GITHUB_API_URL}/repos/{owner}/{repo}'
+        session = get_session(api_url)
+        response, kind = github_request(session, 'GET', api_url,
+                                        headers={**headers, **conditional_headers(cached)})
+        
+        if response is None:
+            return RepoResult(status=Status.RATE_LIMIT,
+                              message=f'等待 API 配额超过 {GITHUB_SCHEDULER.max_wait:g} 秒上限，未检查')
+        elif kind == 'rate_limit':
+            return RepoResult(status=Status.RATE_LIMIT, message='API 配额已用尽，请设置 GITHUB_TOKEN')
+        elif kind == 'secondary_rate_limit':
+            return RepoResult(status=Status.SECONDARY_RATE_LIMIT, message='触发 GitHub 次级速率限制（请求过于密集）')
+        
+        if response.status_code == 304 and cached:
+            RESULT_CACHE.touch('repo', cache_key)
+            return refresh_repo_result(cached['result'])
+        
+        if response.status_code == 404:
+            result = RepoResult(status=Status.NOT_FOUND, message='仓库不存在或已删除')
+            if RESULT_CACHE:
+                RESULT_CACHE.store('repo', cache_key, result)
+            return result
+        elif kind == 'forbidden':
+            return RepoResult(status=Status.ERROR, message='HTTP 403 访问被拒绝')
+        elif response.status_code != 200:
+            return RepoResult(status=Status.ERROR, message=f'HTTP {response.status_code}')
+        
+        data = response.json()
+        
+        # 检查是否归档
+        if data.get('archived'):
+            result = RepoResult(status=Status.ARCHIVED, message='仓库已归档')
+            if RESULT_CACHE:
+                RESULT_CACHE.store('repo', cache_key, result, response.headers)
+            return result
+        
+        # 获取最后提交时间
+        last_push = datetime.strptime(data['pushed_at'], '%Y-%m-%dT%H:%M:%SZ')
+        days_since_update = (datetime.now() - last_push).days
+        
+        # 获取最新 release（历史记录中 pushed_at 未变化时沿用上次的版本，不再请求）
+        previous_release = HISTORY.release_for(cache_key, data['pushed_at']) if HISTORY else None
+        if previous_release is not None:
+            latest_release = previous_release[0]
+        else:
+            release_url = f'{GITHUB_API_URL}/repos/{owner}/{repo}/releases/latest'
+            release_response, _ = github_request(session, 'GET', release_url, headers=headers)
+            release_status = release_response.status_code if release_response is not None else None
+            if release_status == 200:
+                release_data = release_response.json()
+                latest_release = release_data.get('tag_name')
+            elif release_status == 404:
+                latest_release = None
+            else:
+                # 速率限制、5xx 等暂时性失败：版本未知，结果中不含该字段，也不写入历史供下次复用
+                latest_release = _UNSET
+        
+        result = RepoResult(
+            status=Status.ACTIVE if days_since_update < 180 else Status.INACTIVE,
+            stars=data.get('stargazers_count', 0),
+            forks=data.get('forks_count', 0),
+            license=data.get('license', {}).get('spdx_id', 'Unknown'),
+            last_push=last_push.strftime('%Y-%m-%d'),
+            pushed_at=data['pushed_at'],
+            days_since_update=days_since_update,
+            latest_release=latest_release,
+            message='OK'
+        )
+        # 版本未知的结果不缓存，下次重新获取
+        if RESULT_CACHE and 'latest_release' in result:
+            RESULT_CACHE.store('repo', cache_key, result, response.headers)
+        return result
+    except Exception as e:
+        return RepoResult(status=Status.ERROR, message=str(e))
+
+
+def refresh_repo_result(result: Dict) -> RepoResult:
+    """根据缓存中的最后推送日期重新计算未更新天数和活跃状态"""
+    result = RepoResult.from_dict(result)
+    if result.get('last_push'):
+        last_push = datetime.strptime(result['last_push'], '%Y-%m-%d')
+        result['days_since_update'] = (datetime.now() - last_push).days
+        result['status'] = Status.ACTIVE if result['days_since_update'] < 180 else Status.INACTIVE
+    return result
+
+
+GRAPHQL_REPO_FIELDS = """
+    stargazerCount
+    forkCount
+    licenseInfo { spdxId }
+    pushedAt
+    isArchived
+    latestRelease { tagName }
+"""
+
+
+def build_graphql_query(pairs: List[Tuple[str, str]]) -> Tuple[str, Dict]:
+    """
+    为一批仓库构造带别名的 GraphQL 查询
+    返回: (query, variables)
+    """
+    params = []
+    fields = []
+    variables = {}
+    for i, (owner, repo) in enumerate(pairs):
+        params.append(f'$o{i}: String!, $n{i}: String!')
+        fields.append(f'r{i}: repository(owner: $o{i}, name: $n{i}) {{{GRAPHQL_REPO_FIELDS}}}')
+        variables[f'o{i}'] = owner
+        variables[f'n{i}'] = repo
+    
+    query = f"query({', '.join(params)}) {{\n" + '\n'.join(fields) + '\n}'
+    return query, variables
+
+
+def parse_graphql_repo(node: Dict) -> RepoResult:
+    """将 GraphQL repository 节点转换为与 check_github_repo 相同的结果格式"""
+    if node is None:
+        return RepoResult(status=Status.NOT_FOUND, message='仓库不存在或已删除')
+    
+    if node.get('isArchived'):
+        return RepoResult(status=Status.ARCHIVED, message='仓库已归档')
+    
+    last_push = datetime.strptime(node['pushedAt'], '%Y-%m-%dT%H:%M:%SZ')
+    days_since_update = (datetime.now() - last_push).days
+    
+    license_info = node.get('licenseInfo')
+    latest_release = node.get('latestRelease')
+    
+    return RepoResult(
+        status=Status.ACTIVE if days_since_update < 180 else Status.INACTIVE,
+        stars=node.get('stargazerCount', 0),
+        forks=node.get('forkCount', 0),
+        license=(license_info.get('spdxId') or 'NOASSERTION') if license_info else 'Unknown',
+        last_push=last_push.strftime('%Y-%m-%d'),
+        pushed_at=node['pushedAt'],
+        days_since_update=days_since_update,
+        latest_release=latest_release.get('tagName') if latest_release else None,
+        message='OK'
+    )
+
+
+def check_github_repos_graphql_batch(pairs: List[Tuple[str, str]]) -> List[Dict]:
+    """
+    使用一次 GraphQL 查询检查一批仓库
+    返回与 pairs 顺序一致的结果列表
+    """
+    headers = {'User-Agent': USER_AGENT}
+    if GITHUB_TOKEN:
+        headers['Authorization'] = f'bearer {GITHUB_TOKEN}'
+    
+    query, variables = build_graphql_query(pairs)
+    graphql_url = f'{GITHUB_API_URL}/graphql'
+    
+    try:
+        response, kind = github_request(
+            get_session(graphql_url), 'POST', graphql_url,
+            headers=headers,
+            json={'query': query, 'variables': variables}
+        )
+        
+        if kind in ('rate_limit', 'secondary_rate_limit'):
+            return [RepoResult(status=kind, message='GitHub API 速率限制') for _ in pairs]
+        elif response.status_code in (401, 403):
+            return [RepoResult(status=Status.ERROR,
+                               message=f'HTTP {response.status_code} 未授权，GraphQL 需要 GITHUB_TOKEN')
+                    for _ in pairs]
+        elif response.status_code != 200:
+            return [RepoResult(status=Status.ERROR, message=f'HTTP {response.status_code}') for _ in pairs]
+        
+        payload = response.json()
+        data = payload.get('data')
+        if data is None:
+            errors = payload.get('errors') or [{}]
+            message = errors[0].get('message', '未知错误')
+            return [RepoResult(status=Status.ERROR, message=f'GraphQL 错误: {message}') for _ in pairs]
+        
+        # 部分仓库查询失败时 data 中对应节点为 null，错误信息在 errors 中按别名给出
+        node_errors = {error['path'][0]: error for error in payload.get('errors') or []
+                       if error.get('path') and error.get('type') != 'NOT_FOUND'}
+        results = []
+        for i in range(len(pairs)):
+            node_error = node_errors.get(f'r{i}')
+            if node_error and data.get(f'r{i}') is None:
+                results.append(RepoResult(status=Status.ERROR,
+                                          message=f"GraphQL 错误: {node_error.get('message', '未知错误')}"))
+                continue
+            try:
+                results.append(parse_graphql_repo(data.get(f'r{i}')))
+            except Exception as e:
+                results.append(RepoResult(status=Status.ERROR, message=str(e)))
+        return results
+    except Exception as e:
+        return [RepoResult(status=Status.ERROR, message=str(e)) for _ in pairs]
+
+
+def print_repo_status(result: Dict):
+    """打印单个仓库的检查状态"""
+    if result['status'] == Status.ACTIVE:
+        print(f"  {Colors.GREEN}✓ 活跃{Colors.END} - {result.get('stars', 0)} stars, 最后更新: {result.get('last_push')}")
+    elif result['status'] == Status.INACTIVE:
+        print(f"  {Colors.YELLOW}⚠ 不活跃{Colors.END} - {result['days_since_update']} 天未更新")
+    elif result['status'] == Status.ARCHIVED:
+        print(f"  {Colors.RED}✗ 已归档{Colors.END}")
+    else:
+        print(f"  {Colors.RED}✗ {result['message']}{Colors.END}")
+
+
+def parse_github_url(url: str) -> Tuple[str, str]:
+    """解析 GitHub 仓库 URL，返回 (owner, repo)，无法解析时返回 None"""
+    match = re.match(r'https://github\.com/([^/]+)/([^/]+)', url)
+    if not match:
+        return None
+    return match.groups()
+
+
+def github_repo_entries(repos: List[Tuple[str, str]]) -> List[Tuple[str, str, Tuple[str, str]]]:
+    """解析 owner/repo，跳过无法解析的 URL；返回 [(名称, URL, (owner, repo)), ...]"""
+    entries = []
+    for name, url in repos:
+        parsed = parse_github_url(url)
+        if parsed:
+            entries.append((name, url, parsed))
+    return entries
+
+
+def estimate_repo_requests(owner: str, repo: str) -> int:
+    """
+    预计检查一个仓库需要的 REST 请求数：缓存未过期时 0 次；
+    历史中有已确认的版本时通常可以跳过 releases/latest，只需 1 次；否则 2 次
+    """
+    key = f'{owner}/{repo}'.lower()
+    cached = RESULT_CACHE.lookup('repo', key) if RESULT_CACHE else None
+    if cached and cached['fresh']:
+        return 0
+    if HISTORY and HISTORY.knows_release(key):
+        return 1
+    return 2
+
+
+def check_github_repo_scheduled(owner: str, repo: str, expected: int) -> RepoResult:
+    """检查仓库，完成后把预计 expected 次中没有发送的请求从调度器的剩余请求数中扣除"""
+    GITHUB_SCHEDULER.track()
+    try:
+        return check_github_repo(owner, repo)
+    finally:
+        GITHUB_SCHEDULER.settle(expected)
+
+
+def _iter_repo_entries(entries: List[Tuple[str, str, Tuple[str, str]]],
+                       backend: str = 'rest') -> Iterator[Tuple[int, Dict]]:
+    """按完成顺序产出 (条目序号, 结果)，结果已带上 name 和 url"""
+    if backend == 'graphql':
+        yield from _iter_repo_entries_graphql(entries)
+        return
+    
+    # 登记预计请求数，由调度器根据剩余配额控制节奏；每个仓库检查完后退还没用掉的部分
+    estimates = [estimate_repo_requests(owner, repo) for _, _, (owner, repo) in entries]
+    GITHUB_SCHEDULER.expect(sum(estimates))
+    executor = futures.ThreadPoolExecutor(max_workers=GITHUB_MAX_WORKERS)
+    try:
+        future_to_index = {
+            executor.submit(timed_call, check_github_repo_scheduled, time.perf_counter(),
+                            f'{GITHUB_API_URL}/repos/{owner}/{repo}', owner, repo, estimate): index
+            for index, ((_, _, (owner, repo)), estimate) in enumerate(zip(entries, estimates))
+        }
+        for future in futures.as_completed(future_to_index):
+            index = future_to_index[future]
+            name, url, _ = entries[index]
+            result = future.result()
+            result['name'] = name
+            result['url'] = url
+            yield index, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# 由 GraphQL 仓库节点得出的状态；整批失败（HTTP 错误、未授权、查询错误、速率限制）的结果不写入缓存
+GRAPHQL_CACHEABLE = {Status.NOT_FOUND, Status.ARCHIVED, Status.ACTIVE, Status.INACTIVE}
+
+
+def _iter_repo_entries_graphql(entries: List[Tuple[str, str, Tuple[str, str]]]) -> Iterator[Tuple[int, Dict]]:
+    """GraphQL 后端：缓存命中的仓库先产出，其余每批 GRAPHQL_BATCH_SIZE 个查询后产出"""
+    pending = []
+    for index, (name, url, (owner, repo)) in enumerate(entries):
+        # 缓存中未过期的仓库不再查询
+        cached = RESULT_CACHE.lookup('repo', f'{owner}/{repo}'.lower()) if RESULT_CACHE else None
+        if cached and cached['fresh']:
+            result = refresh_repo_result(cached['result']).replace(name=name, url=url)
+            result.from_cache = True
+            yield index, result
+        else:
+            pending.append(index)
+    
+    for start in range(0, len(pending), GRAPHQL_BATCH_SIZE):
+        batch = pending[start:start + GRAPHQL_BATCH_SIZE]
+        batch_results = check_github_repos_graphql_batch([entries[index][2] for index in batch])
+        
+        for index, result in zip(batch, batch_results):
+            name, url, (owner, repo) = entries[index]
+            if RESULT_CACHE and result['status'] in GRAPHQL_CACHEABLE:
+                RESULT_CACHE.store('repo', f'{owner}/{repo}'.lower(), result)
+            result['name'] = name
+            result['url'] = url
+            yield index, result
+
+
+def iter_repo_results(repos: List[Tuple[str, str]], backend: str = 'rest') -> Iterator[RepoResult]:
+    """
+    检查 GitHub 仓库，按完成顺序逐个产出结果
+    backend 含义同 check_github_repos；无法解析的 URL 被跳过
+    """
+    for _, result in _iter_repo_entries(github_repo_entries(repos), backend):
+        yield result
+
+
+async def aiter_repo_results(repos: List[Tuple[str, str]], backend: str = 'rest') -> AsyncIterator[RepoResult]:
+    """iter_repo_results 的异步版本：在线程池中推进同步迭代器，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    iterator = iter_repo_results(repos, backend)
+    done = object()
+    try:
+        while True:
+            result = await loop.run_in_executor(None, next, iterator, done)
+            if result is done:
+                return
+            yield result
+    finally:
+        await loop.run_in_executor(None, iterator.close)
+
+
+def check_github_repos(repos: List[Tuple[str, str]], backend: str = 'rest',
+                       on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """
+    检查所有 GitHub 仓库
+    backend: 'rest' 并发调用 REST API（由 GITHUB_SCHEDULER 根据剩余配额控制节奏）；
+             'graphql' 每次查询批量检查 GRAPHQL_BATCH_SIZE 个仓库
+    on_result 在每个结果完成时调用；返回值保持输入顺序
+    """
+    entries = github_repo_entries(repos)
+    results: List[Dict] = [None] * len(entries)
+    
+    for i, (index, result) in enumerate(_iter_repo_entries(entries, backend), 1):
+        results[index] = result
+        if on_result:
+            on_result(result)
+        
+        # 显示状态
+        if SHOW_PROGRESS:
+            name, _, (owner, repo) = entries[index]
+            print(f"[{i}/{len(entries)}] {name} ({owner}/{repo})")
+            print_repo_status(result)
+    
+    return results
+
+
+def check_github_repos_graphql(repos: List[Tuple[str, str]],
+                               on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """使用 GraphQL 批量查询检查所有 GitHub 仓库，结果格式与 REST 后端一致"""
+    return check_github_repos(repos, backend='graphql', on_result=on_result)
+
+
+def filter_status(results: List[Dict], *statuses: str) -> Iterator[Dict]:
+    """按状态过滤；ResultTable 只遍历状态列"""
+    if isinstance(results, ResultTable):
+        return results.filter(*statuses)
+    return (r for r in results if r['status'] in statuses)
+
+
+def format_locations(result: Dict) -> str:
+    """格式化链接在源文件中的位置，如 ` (README.md:12, docs/a.md:3)`"""
+    locations = result.get('locations')
+    if not locations:
+        return ''
+    return ' (' + ', '.join(f'`{location}`' for location in locations) + ')'
+
+
+def count_statuses(results: List[Dict]) -> Dict[str, int]:
+    """一次遍历统计各状态的数量"""
+    if isinstance(results, ResultTable):
+        return results.counts()
+    counts: Dict[str, int] = {}
+    for r in results:
+        status = r.get('status')
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def group_by_status(results: List[Dict]) -> Dict[str, List[Dict]]:
+    """一次遍历按状态分组"""
+    if isinstance(results, ResultTable):
+        return results.group_by_status()
+    groups: Dict[str, List[Dict]] = {}
+    for r in results:
+        groups.setdefault(r.get('status'), []).append(r)
+    return groups
+
+
+def generate_link_report_md(results: List[Dict], filename: str):
+    """生成链接检查的 Markdown 报告"""
+    groups = group_by_status(results)
+    
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("# 链接校验报告\n\n")
+        f.write(f"**生成时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write("## 统计\n\n")
+        f.write(f"- 总计: {len(results)} 个链接\n")
+        f.write(f"- ✅ 成功: {len(groups.get('success', []))}\n")
+        f.write(f"- ⚠️ 警告: {len(groups.get('warning', []))}\n")
+        f.write(f"- ❌ 失败: {len(groups.get('error', []))}\n\n")
+        
+        sections = [
+            ('error', '## ❌ 失败的链接', True),
+            ('warning', '## ⚠️ 警告的链接', True),
+            ('success', '## ✅ 成功的链接', False),
+        ]
+        for status, title, with_locations in sections:
+            if not groups.get(status):
+                continue
+            f.write(f"{title}\n\n")
+            for r in groups[status]:
+                locations = format_locations(r) if with_locations else ''
+                f.write(f"- [{r['text']}]({normalize_url(r['url'])}) - {r['message']}{locations}\n")
+            f.write("\n")
+
+
+REPO_BADGES = {
+    'active': 'badge-active',
+    'inactive': 'badge-inactive',
+    'archived': 'badge-archived',
+    'not_found': 'badge-error',
+    'error': 'badge-error'
+}
+
+HTML_REPORT_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>数据标注工具健康检查报告</title>
+    <style>
+        body { font-family: 'Segoe UI', Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }
+        .container { max-width: 1400px; margin: 0 auto; }
+        h1 { color: #333; margin-bottom: 10px; }
+        .timestamp { color: #666; margin-bottom: 30px; }
+        .section { background: white; padding: 25px; border-radius: 8px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .summary { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; }
+        .summary-item { padding: 15px; border-radius: 6px; text-align: center; }
+        .summary-item h3 { margin: 0 0 10px 0; font-size: 14px; color: #666; }
+        .summary-item .number { font-size: 32px; font-weight: bold; margin: 0; }
+        .success { background: #d4edda; color: #155724; }
+        .warning { background: #fff3cd; color: #856404; }
+        .danger { background: #f8d7da; color: #721c24; }
+        .info { background: #d1ecf1; color: #0c5460; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background: #4CAF50; color: white; position: sticky; top: 0; }
+        tr:hover { background: #f5f5f5; }
+        .status-badge { padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: bold; }
+        .badge-active { background: #28a745; color: white; }
+        .badge-inactive { background: #ffc107; color: #333; }
+        .badge-archived { background: #dc3545; color: white; }
+        .badge-error { background: #6c757d; color: white; }
+        .badge-success { background: #28a745; color: white; }
+        .badge-warning { background: #ffc107; color: #333; }
+        .pager { margin-top: 15px; display: flex; gap: 10px; align-items: center; }
+        .pager button { padding: 4px 12px; }
+        a { color: #007bff; text-decoration: none; }
+        a:hover { text-decoration: underline; }
+    </style>
+</head>
+<body>
+    <div class="container">
+"""
+
+# 分页渲染：表格数据以 JSON 嵌入页面，每次只渲染一页，避免上万行的 DOM
+HTML_REPORT_PAGER_SCRIPT = """    <script>
+    function paginate(tableId, render) {
+        var rows = JSON.parse(document.getElementById(tableId + '-data').textContent);
+        var tbody = document.querySelector('#' + tableId + ' tbody');
+        var pager = document.getElementById(tableId + '-pager');
+        var pageSize = parseInt(pager.dataset.pageSize, 10);
+        var pages = Math.max(1, Math.ceil(rows.length / pageSize));
+        var page = 0;
+        function cell(tr, value, href) {
+            var td = tr.insertCell();
+            if (href) {
+                var a = document.createElement('a');
+                a.href = href; a.target = '_blank'; a.textContent = value;
+                td.appendChild(a);
+            } else if (value && value.badge) {
+                var span = document.createElement('span');
+                span.className = 'status-badge ' + value.badge; span.textContent = value.text;
+                td.appendChild(span);
+            } else {
+                td.textContent = value === null || value === undefined ? 'N/A' : value;
+            }
+        }
+        function show() {
+            tbody.textContent = '';
+            rows.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+                render(tbody.insertRow(), row, cell);
+            });
+            pager.querySelector('span').textContent = (page + 1) + ' / ' + pages + ' 页，共 ' + rows.length + ' 行';
+        }
+        pager.querySelector('.prev').onclick = function () { if (page > 0) { page--; show(); } };
+        pager.querySelector('.next').onclick = function () { if (page < pages - 1) { page++; show(); } };
+        show();
+    }
+    if (document.getElementById('repo-table')) {
+        paginate('repo-table', function (tr, r, cell) {
+            cell(tr, r.name, r.url);
+            cell(tr, {badge: r.badge, text: r.status.toUpperCase()});
+            cell(tr, r.stars); cell(tr, r.trend || ''); cell(tr, r.forks); cell(tr, r.last_push);
+            cell(tr, r.latest_release); cell(tr, r.license); cell(tr, r.message || '');
+        });
+    }
+    if (document.getElementById('failed-table')) {
+        paginate('failed-table', function (tr, r, cell) {
+            cell(tr, r.text); cell(tr, r.url, r.href); cell(tr, r.message);
+            cell(tr, (r.locations || []).join(', '));
+        });
+    }
+    </script>
+"""
+
+
+def write_json_rows(f, rows: Iterator[Dict]):
+    """逐行把数据写成可嵌入 <script> 的 JSON 数组"""
+    f.write('[')
+    for i, row in enumerate(rows):
+        if i:
+            f.write(',\n')
+        f.write(json.dumps(row, ensure_ascii=False).replace('</', '<\\/'))
+    f.write(']')
+
+
+def write_summary_cards(f, items: List[Tuple[str, str, int]]):
+    """写出统计卡片: [(样式, 标题, 数量), ...]"""
+    f.write('            <div class="summary">\n')
+    for css_class, title, number in items:
+        f.write(f"""                <div class="summary-item {css_class}">
+                    <h3>{title}</h3>
+                    <p class="number">{number}</p>
+                </div>
+""")
+    f.write('            </div>\n')
+
+
+def write_paged_table(f, table_id: str, headers: List[str], rows: Iterator[Dict]):
+    """写出分页表格：表头 + 嵌入的 JSON 数据 + 翻页控件"""
+    f.write(f'            <table id="{table_id}">\n                <thead>\n                    <tr>\n')
+    for header in headers:
+        f.write(f'                        <th>{header}</th>\n')
+    f.write('                    </tr>\n                </thead>\n                <tbody></tbody>\n            </table>\n')
+    f.write(f'            <div class="pager" id="{table_id}-pager" data-page-size="{REPORT_PAGE_SIZE}">'
+            '<button class="prev">上一页</button><span></span><button class="next">下一页</button></div>\n')
+    f.write(f'            <script type="application/json" id="{table_id}-data">')
+    write_json_rows(f, rows)
+    f.write('</script>\n')
+
+
+def write_timing_section(f, metrics: MetricsCollector):
+    """写出耗时分析：各阶段汇总、最慢的主机和 URL"""
+    phase_names = {
+        'queue': '排队等待', 'dns': 'DNS 解析', 'connect': 'TCP 连接',
+        'tls': 'TLS 握手', 'ttfb': '首字节', 'total': '单次检查总耗时',
+    }
+    f.write("""
+        <div class="section">
+            <h2>⏱️ 耗时分析</h2>
+""")
+    preflight = metrics.dns_preflight
+    if preflight:
+        f.write(f"            <p>DNS 预解析: {preflight['hosts']} 个主机，耗时 {preflight['seconds']:.2f} s"
+                f"（成功 {preflight['resolved']}，域名不存在 {preflight['nxdomain']}，"
+                f"暂时失败 {preflight['failed']}）</p>\n")
+    f.write("""            <table>
+                <thead><tr><th>阶段</th><th>次数</th><th>平均 (ms)</th><th>累计 (s)</th></tr></thead>
+                <tbody>
+""")
+    for phase, entry in metrics.phase_summary().items():
+        f.write(f"                    <tr><td>{phase_names.get(phase, phase)}</td><td>{entry['count']}</td>"
+                f"<td>{entry['mean'] * 1000:.1f}</td><td>{entry['sum']:.2f}</td></tr>\n")
+    f.write("""                </tbody>
+            </table>
+            <h3>🐢 最慢的主机</h3>
+            <table>
+                <thead><tr><th>主机</th><th>检查次数</th><th>平均 (ms)</th><th>累计 (s)</th></tr></thead>
+                <tbody>
+""")
+    for host in metrics.slowest_hosts():
+        f.write(f"                    <tr><td>{saxutils.escape(host['host'])}</td><td>{host['count']}</td>"
+                f"<td>{host['mean'] * 1000:.1f}</td><td>{host['sum']:.2f}</td></tr>\n")
+    f.write("""                </tbody>
+            </table>
+            <h3>🐢 最慢的 URL</h3>
+            <table>
+                <thead><tr><th>URL</th><th>耗时 (ms)</th></tr></thead>
+                <tbody>
+""")
+    for url, seconds in metrics.slowest_urls():
+        f.write(f'                    <tr><td><a href="{saxutils.escape(url)}" target="_blank">{saxutils.escape(url)}</a></td>'
+                f'<td>{seconds * 1000:.1f}</td></tr>\n')
+    f.write("""                </tbody>
+            </table>
+        </div>
+""")
+
+
+def format_trend(trend: Dict) -> str:
+    """趋势列：Stars 增长以及近期的状态变化"""
+    if not trend:
+        return ''
+    parts = []
+    if trend.get('stars_delta') is not None:
+        parts.append(f"{trend['stars_delta']:+d} ⭐ (自 {trend['since']})")
+    if trend.get('old_status'):
+        parts.append(f"原为 {trend['old_status']}")
+    return ', '.join(parts)
+
+
+def generate_html_report(link_results: List[Dict], repo_results: List[Dict], output_file: str,
+                         metrics: MetricsCollector = None, trends: Dict[str, Dict] = None):
+    """
+    生成综合 HTML 报告（边统计边写入文件，表格分页显示）
+    trends 为 HistoryStore.trends() 的结果，提供时显示趋势列
+    """
+    link_counts = count_statuses(link_results)
+    repo_counts = count_statuses(repo_results)
+    
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(HTML_REPORT_HEAD)
+        f.write(f"""        <h1>📊 数据标注工具健康检查报告</h1>
+        <p class="timestamp">生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        
+        <div class="section">
+            <h2>📈 链接检查统计</h2>
+""")
+        write_summary_cards(f, [
+            ('success', '✅ 成功', link_counts.get('success', 0)),
+            ('warning', '⚠️ 警告', link_counts.get('warning', 0)),
+            ('danger', '❌ 失败', link_counts.get('error', 0)),
+            ('info', '📊 总计', len(link_results)),
+        ])
+        f.write("""        </div>
+        
+        <div class="section">
+            <h2>🔧 GitHub 仓库健康状态</h2>
+""")
+        write_summary_cards(f, [
+            ('success', '✅ 活跃', repo_counts.get('active', 0)),
+            ('warning', '⚠️ 不活跃', repo_counts.get('inactive', 0)),
+            ('danger', '🔴 归档', repo_counts.get('archived', 0)),
+            ('danger', '❌ 错误', repo_counts.get('not_found', 0) + repo_counts.get('error', 0)),
+        ])
+        write_paged_table(
+            f, 'repo-table',
+            ['工具名称', '状态', '⭐ Stars', '📈 趋势', '🍴 Forks', '📅 最后更新', '🏷️ 最新版本', '📜 协议', '说明'],
+            ({
+                'name': r['name'],
+                'url': r['url'],
+                'status': r['status'],
+                'badge': REPO_BADGES.get(r['status'], 'badge-error'),
+                'stars': r.get('stars'),
+                'trend': format_trend((trends or {}).get(history_key(r['url']))),
+                'forks': r.get('forks'),
+                'last_push': r.get('last_push'),
+                'latest_release': r.get('latest_release'),
+                'license': r.get('license'),
+                'message': r.get('message', ''),
+            } for r in repo_results)
+        )
+        f.write("        </div>\n")
+        
+        # 添加失败的链接表格
+        if link_counts.get('error'):
+            f.write("""
+        <div class="section">
+            <h2>❌ 失败的链接</h2>
+""")
+            write_paged_table(
+                f, 'failed-table',
+                ['链接文本', 'URL', '错误信息', '位置'],
+                ({
+                    'text': r['text'],
+                    'url': r['url'],
+                    'href': normalize_url(r['url']),
+                    'message': r['message'],
+                    'locations': r.get('locations', []),
+                } for r in filter_status(link_results, Status.ERROR))
+            )
+            f.write("        </div>\n")
+        
+        if metrics is not None and metrics.phase_summary():
+            write_timing_section(f, metrics)
+        
+        f.write("    </div>\n")
+        f.write(HTML_REPORT_PAGER_SCRIPT)
+        f.write("</body>\n</html>")
+
+
+def report_records(link_results: List[Dict], repo_results: List[Dict]) -> Iterator[Dict]:
+    """把链接和仓库结果统一成带 kind 字段的记录，供机器可读报告使用"""
+    for r in link_results:
+        yield dict(r, kind='link')
+    for r in repo_results:
+        yield dict(r, kind='repo')
+
+
+def build_summary(link_results: List[Dict], repo_results: List[Dict]) -> Dict:
+    """一次遍历统计两类结果"""
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'links': dict(count_statuses(link_results), total=len(link_results)),
+        'repos': dict(count_statuses(repo_results), total=len(repo_results)),
+    }
+
+
+def generate_json_report(link_results: List[Dict], repo_results: List[Dict], filename: str):
+    """生成 JSON 报告：{'summary': {...}, 'results': [...]}，结果逐条写入"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('{"summary": ')
+        f.write(json.dumps(build_summary(link_results, repo_results), ensure_ascii=False))
+        f.write(',\n"results": [\n')
+        for i, record in enumerate(report_records(link_results, repo_results)):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write('\n]}\n')
+
+
+def generate_ndjson_report(link_results: List[Dict], repo_results: List[Dict], filename: str):
+    """生成 NDJSON 报告：每行一条结果"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for record in report_records(link_results, repo_results):
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class NDJSONStream:
+    """
+    边检查边输出 NDJSON：每条结果一确定就写出一行并立即 flush（线程安全）
+    下游可以在运行过程中就开始处理失败项
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._lock = threading.Lock()
+
+    def write(self, kind: str, result: Dict):
+        line = json.dumps(dict(result, kind=kind), ensure_ascii=False)
+        with self._lock:
+            self._f.write(line + '\n')
+            self._f.flush()
+
+    def link_writer(self, link_index: 'LinkIndex', pairs: List[Tuple[str, str]]) -> Callable[[Dict], None]:
+        """返回链接结果的回调：把按目标检查的结果分发到各出现位置后逐条写出"""
+        groups = link_index.group(pairs)
+        
+        def write_link(result: Dict):
+            for record in link_index.fan_out([result], groups.get(canonicalize_url(result['url']), [])):
+                self.write('link', record)
+        return write_link
+
+    def repo_writer(self) -> Callable[[Dict], None]:
+        return lambda result: self.write('repo', result)
+
+
+def write_junit_suite(f, name: str, cases: List[Tuple[str, str, str, str]]):
+    """
+    写出一个 JUnit testsuite
+    cases: [(用例名, 类名, 结果: 'pass'|'failure'|'skipped', 说明), ...]
+    """
+    failures = sum(1 for case in cases if case[2] == 'failure')
+    skipped = sum(1 for case in cases if case[2] == 'skipped')
+    f.write(f'  <testsuite name={saxutils.quoteattr(name)} tests="{len(cases)}" '
+            f'failures="{failures}" skipped="{skipped}" errors="0">\n')
+    for case_name, classname, outcome, message in cases:
+        f.write(f'    <testcase name={saxutils.quoteattr(case_name)} classname={saxutils.quoteattr(classname)}')
+        if outcome == 'failure':
+            f.write(f'>\n      <failure message={saxutils.quoteattr(message)}/>\n    </testcase>\n')
+        elif outcome == 'skipped':
+            f.write(f'>\n      <skipped message={saxutils.quoteattr(message)}/>\n    </testcase>\n')
+        elif message and message != 'OK':
+            f.write(f'>\n      <system-out>{saxutils.escape(message)}</system-out>\n    </testcase>\n')
+        else:
+            f.write('/>\n')
+    f.write('  </testsuite>\n')
+
+
+def generate_junit_report(link_results: List[Dict], repo_results: List[Dict], filename: str):
+    """生成 JUnit XML 报告，失败判定与退出码一致"""
+    link_cases = [
+        (r['url'], ', '.join(r.get('locations', [])) or 'links',
+         'failure' if r['status'] == Status.ERROR else 'pass', r.get('message', ''))
+        for r in link_results
+    ]
+    repo_cases = []
+    for r in repo_results:
+        if r['status'] in (Status.NOT_FOUND, Status.ERROR):
+            outcome = 'failure'
+        elif r['status'] in (Status.RATE_LIMIT, Status.SECONDARY_RATE_LIMIT):
+            outcome = 'skipped'
+        else:
+            outcome = 'pass'
+        message = r.get('message', '')
+        if r['status'] in (Status.INACTIVE, Status.ARCHIVED):
+            message = f"{r['status']}: {message}"
+        repo_cases.append((r['name'], r['url'], outcome, message))
+    
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="label-tools">\n')
+        write_junit_suite(f, 'links', link_cases)
+        write_junit_suite(f, 'repos', repo_cases)
+        f.write('</testsuites>\n')
+
+
+def manifest_key(text: str, url: str) -> str:
+    """清单中条目的键：链接文本 + URL（文本变化也视为修改）"""
+    return f'{text}\t{url}'
+
+
+def load_manifest(path: str) -> Dict:
+    """读取上次运行的清单，不存在或损坏时返回空清单"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault('links', {})
+    manifest.setdefault('repos', {})
+    return manifest
+
+
+def save_manifest(path: str, manifest: Dict, link_results: List[Dict] = None,
+                  repo_results: List[Dict] = None):
+    """保存本次运行的清单；未执行的阶段沿用上次的内容"""
+    if link_results is not None:
+        manifest['links'] = {manifest_key(r['text'], r['url']): dict(r) for r in link_results}
+    if repo_results is not None:
+        manifest['repos'] = {manifest_key(r['name'], r['url']): dict(r) for r in repo_results}
+    manifest['generated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+
+def git_changed_lines(rev_range: str, files: List[str]) -> Dict[str, set]:
+    """
+    解析 git diff，返回各文件新增/修改的行号
+    rev_range 可以是 'origin/main'（与工作区比较）或 'A..B'
+    返回: {文件绝对路径: {行号, ...}}
+    """
+    toplevel = subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'],
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+    diff = subprocess.run(
+        ['git', 'diff', '--unified=0', '--no-color', rev_range, '--'] + files,
+        capture_output=True, text=True, check=True
+    ).stdout
+    
+    changed: Dict[str, set] = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith('+++ '):
+            path = line[4:]
+            current = None if path == '/dev/null' else os.path.realpath(os.path.join(toplevel, path[2:]))
+        elif line.startswith('@@') and current:
+            match = re.match(r'@@ -\S+ \+(\d+)(?:,(\d+))? @@', line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                changed.setdefault(current, set()).update(range(start, start + count))
+    return changed
+
+
+# 增量模式可以复用的上次结果状态；失败、超时、速率限制、熔断等结果总是重新检查
+INCREMENTAL_REUSABLE = {Status.SUCCESS, Status.ACTIVE, Status.INACTIVE, Status.ARCHIVED}
+
+
+def split_incremental(keys: List[Tuple[str, str]], locations: Dict[Tuple[str, str], List[str]],
+                      previous: Dict[str, Dict], changed_lines: Dict[str, set] = None
+                      ) -> Tuple[List[Tuple[str, str]], Dict[Tuple[str, str], Dict]]:
+    """
+    将条目分为需要在线检查的和可复用上次结果的
+    - 上次清单中没有的条目（新增或文本/URL 被修改）总是需要检查
+    - 指定了 git 修改范围时，位于修改行上的条目也需要检查
+    - 上次结果不是通过状态（INCREMENTAL_REUSABLE）的条目重新检查，避免暂时性失败一直保留
+    返回: (需要检查的条目, {条目: 上次结果})
+    """
+    to_check = []
+    reused = {}
+    for key in keys:
+        result = previous.get(manifest_key(*key))
+        touched = False
+        if changed_lines is not None:
+            for location in locations.get(key, []):
+                source, _, line_no = location.rpartition(':')
+                if int(line_no) in changed_lines.get(os.path.realpath(source), ()):
+                    touched = True
+                    break
+        
+        if result is None or touched or result.get('status') not in INCREMENTAL_REUSABLE:
+            to_check.append(key)
+        else:
+            reused[key] = result
+    return to_check, reused
 
-# 配置
-GITHUB_TOKEN = None  # 可选：设置 GitHub Token 提高 API 限制
-TIMEOUT = 10
-MAX_WORKERS = 10  # 并发线程数
-USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 
-class Colors:
-    GREEN = '\033[92m'
-    RED = '\033[91m'
-    YELLOW = '\033[93m'
-    BLUE = '\033[94m'
-    CYAN = '\033[96m'
-    END = '\033[0m'
+def parse_shard(value: str) -> Tuple[int, int]:
+    """解析 --shard 参数 I/N（I 从 1 开始）"""
+    match = re.fullmatch(r'(\d+)/(\d+)', value.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f'无效的分片 "{value}"，格式应为 I/N 且 1 <= I <= N')
+    return int(match.group(1)), int(match.group(2))
 
 
-def extract_all_links(file_path: str) -> List[Tuple[str, str]]:
+def shard_key(url: str) -> str:
     """
-    从 Markdown 文件中提取所有链接
-    返回: [(链接文本, URL), ...]
+    分片键：按规范化后的主机划分，同一主机的请求留在同一分片，保持连接复用和单主机限速
+    GitHub 仓库主页链接与对应仓库使用同一个键（github.com/owner/repo），
+    使仓库检查结果仍能在本分片内判定该链接；仓库本身都访问 api.github.com，按仓库分散到各分片
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 匹配 Markdown 链接格式: [text](url)
-    pattern = r'\[([^\]]+)\]\(([^\)]+)\)'
-    matches = re.findall(pattern, content)
-    
-    # 过滤掉锚点链接和本地文件链接
-    links = []
-    for text, url in matches:
-        # 跳过锚点链接
-        if url.startswith('#'):
-            continue
-        # 跳过本地文件链接
-        if not url.startswith(('http://', 'https://')):
-            continue
-        links.append((text, url))
-    
-    return links
+    parts = urlsplit(canonicalize_url(url))
+    segments = [s for s in parts.path.split('/') if s]
+    if parts.netloc == 'github.com' and len(segments) == 2:
+        return f'github.com/{segments[0]}/{segments[1]}'.lower()
+    return parts.netloc
 
 
-def extract_github_repos(file_path: str) -> List[Tuple[str, str]]:
+def in_shard(key: str, shard: Tuple[int, int]) -> bool:
+    """用 CRC32 做确定性哈希，各机器、各次运行的划分结果一致"""
+    index, count = shard
+    return zlib.crc32(key.encode('utf-8')) % count == index - 1
+
+
+def save_shard_results(path: str, shard: Tuple[int, int], link_results: List[Dict],
+                       repo_results: List[Dict], link_order: Dict[Tuple[str, str], int],
+                       repo_order: Dict[Tuple[str, str], int]):
     """
-    从 Markdown 文件中提取 GitHub 仓库链接
-    返回: [(工具名称, GitHub URL), ...]
+    保存分片的原始结果，供 merge 子命令合并
+    每条结果附带其在全部输入中的首次出现序号，合并后可恢复与单机运行相同的顺序
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
+    data = {
+        'shard': f'{shard[0]}/{shard[1]}',
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'links': [[link_order[(r['text'], r['url'])], dict(r)] for r in link_results],
+        'repos': [[repo_order[(r['name'], r['url'])], dict(r)] for r in repo_results],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def load_shard_results(paths: List[str]) -> Tuple[List[Dict], List[Dict], List[str]]:
+    """
+    读取并合并多个分片结果文件
+    返回: (链接结果, 仓库结果, 缺失的分片列表)
+    """
+    links = []
     repos = []
-    # 匹配表格行中的 GitHub 链接
-    pattern = r'\|\s*([^|]+?)\s*\|\s*\[([^\]]+)\]\((https://github\.com/[^)]+)\)'
-    matches = re.findall(pattern, content)
+    seen = set()
+    count = None
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index, total = parse_shard(data['shard'])
+        if count is not None and total != count:
+            raise ValueError(f'{path} 属于 {total} 路分片，与其他文件的 {count} 路不一致')
+        if index in seen:
+            raise ValueError(f'分片 {index}/{total} 重复出现: {path}')
+        count = total
+        seen.add(index)
+        links.extend(data.get('links', []))
+        repos.extend(data.get('repos', []))
     
-    for match in matches:
-        tool_name = match[0].strip()
-        url = match[2].strip()
-        repos.append((tool_name, url))
+    missing = [f'{i}/{count}' for i in range(1, (count or 0) + 1) if i not in seen]
+    links.sort(key=lambda entry: entry[0])
+    repos.sort(key=lambda entry: entry[0])
+    return [r for _, r in links], [r for _, r in repos], missing
+
+
+def exit_code(link_results: List[Dict], repo_results: List[Dict]) -> int:
+    """链接失效或仓库不存在/检查出错时返回 1"""
+    link_counts = count_statuses(link_results)
+    repo_counts = count_statuses(repo_results)
+    error_count = link_counts.get('error', 0) + repo_counts.get('not_found', 0) + repo_counts.get('error', 0)
     
-    return repos
+    return 0 if error_count == 0 else 1
 
 
-def normalize_url(url: str) -> str:
-    """标准化 URL"""
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    return url
+def parse_reports(value: str) -> Tuple[str, ...]:
+    """解析 --report 参数：逗号分隔的 md / html / json，none 表示不生成报告"""
+    formats = tuple(dict.fromkeys(name.strip().lower() for name in value.split(',') if name.strip()))
+    if formats == ('none',):
+        return ()
+    unknown = [name for name in formats if name not in REPORT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f'未知的报告格式: {", ".join(unknown)}，'
+                                         f'可选 {", ".join(REPORT_FORMATS)} 或 none')
+    return formats
 
 
-def check_url(url: str, text: str) -> Dict:
+def write_machine_reports(args, link_results: List[Dict], repo_results: List[Dict], ndjson: bool = True):
     """
-    检查单个 URL 是否有效
+    按 --json / --ndjson / --junit 参数输出机器可读报告
+    --report 包含 json 而未指定 --json 时写入 JSON_REPORT_FILE；ndjson=False 表示 NDJSON 已在运行中逐条输出
     """
-    normalized_url = normalize_url(url)
+    machine_reports = [
+        (args.json or (JSON_REPORT_FILE if 'json' in args.report else None), generate_json_report),
+        (args.ndjson if ndjson else None, generate_ndjson_report),
+        (args.junit, generate_junit_report),
+    ]
+    for filename, generate in machine_reports:
+        if filename:
+            generate(link_results, repo_results, filename)
+            print(f"{Colors.GREEN}✓ 报告已保存: {filename}{Colors.END}")
+
+
+def merge_main(argv: List[str]) -> int:
+    """merge 子命令：合并各分片的原始结果，生成与单机运行相同的报告和退出码"""
+    parser = argparse.ArgumentParser(prog='check_tools.py merge',
+                                     description='合并 --shard 运行产生的分片结果文件')
+    parser.add_argument('files', nargs='+', help='分片结果文件，支持通配符')
+    parser.add_argument('--report', type=parse_reports, default=DEFAULT_REPORTS,
+                        help=f'要生成的报告，逗号分隔的 {",".join(REPORT_FORMATS)}，none 表示不生成 (默认: {DEFAULT_REPORTS})')
+    parser.add_argument('--json', metavar='FILE', help='额外输出 JSON 格式的结果报告')
+    parser.add_argument('--ndjson', metavar='FILE', help='额外输出 NDJSON 格式的结果（每行一条）')
+    parser.add_argument('--junit', metavar='FILE', help='额外输出 JUnit XML 报告，便于 CI 展示')
+    args = parser.parse_args(argv)
     
-    headers = {
-        'User-Agent': USER_AGENT,
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    }
+    paths = []
+    for pattern in args.files:
+        matched = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(path for path in matched if path not in paths)
     
     try:
-        response = requests.head(
-            normalized_url,
-            headers=headers,
-            timeout=TIMEOUT,
-            allow_redirects=True
-        )
-        
-        # 如果 HEAD 请求失败，尝试 GET 请求
-        if response.status_code >= 400:
-            response = requests.get(
-                normalized_url,
-                headers=headers,
-                timeout=TIMEOUT,
-                allow_redirects=True
-            )
-        
-        status_code = response.status_code
-        
-        if status_code == 200:
-            return {
-                'url': url,
-                'text': text,
-                'status': 'success',
-                'status_code': status_code,
-                'message': 'OK'
-            }
-        elif 300 <= status_code < 400:
-            return {
-                'url': url,
-                'text': text,
-                'status': 'warning',
-                'status_code': status_code,
-                'message': f'重定向到: {response.url}'
-            }
-        else:
-            return {
-                'url': url,
-                'text': text,
-                'status': 'error',
-                'status_code': status_code,
-                'message': f'HTTP {status_code}'
-            }
-            
-    except requests.exceptions.Timeout:
-        return {
-            'url': url,
-            'text': text,
-            'status': 'error',
-            'status_code': None,
-            'message': '请求超时'
-        }
-    except requests.exceptions.ConnectionError:
-        return {
-            'url': url,
-            'text': text,
-            'status': 'error',
-            'status_code': None,
-            'message': '连接失败'
-        }
-    except Exception as e:
-        return {
-            'url': url,
-            'text': text,
-            'status': 'error',
-            'status_code': None,
-            'message': f'错误: {str(e)}'
-        }
+        link_results, repo_results, missing = load_shard_results(paths)
+    except (OSError, ValueError, KeyError, argparse.ArgumentTypeError) as e:
+        print(f"{Colors.RED}✗ 无法读取分片结果: {e}{Colors.END}")
+        return 2
+    link_results = ResultTable(LinkResult, link_results)
+    repo_results = ResultTable(RepoResult, repo_results)
+    
+    print(f"合并 {len(paths)} 个分片: {len(link_results)} 条链接结果, {len(repo_results)} 个仓库结果")
+    if missing:
+        print(f"{Colors.YELLOW}⚠ 缺少分片: {', '.join(missing)}，报告不完整{Colors.END}")
+    
+    if link_results and 'md' in args.report:
+        generate_link_report_md(link_results, 'link_check_report.md')
+        print(f"\n{Colors.GREEN}✓ 链接检查报告已保存: link_check_report.md{Colors.END}")
+    if (link_results or repo_results) and 'html' in args.report:
+        generate_html_report(link_results, repo_results, 'health_report.html')
+        print(f"{Colors.GREEN}✓ 综合健康报告已生成: health_report.html{Colors.END}")
+    write_machine_reports(args, link_results, repo_results)
+    
+    # 缺少分片时结果不完整，不能视为通过
+    if missing:
+        return 2
+    return exit_code(link_results, repo_results)
 
 
-def check_links_parallel(links: List[Tuple[str, str]]) -> List[Dict]:
-    """并行检查所有链接"""
-    results = []
+def history_main(argv: List[str]) -> int:
+    """history 子命令：查询仓库健康历史中的 Stars 增长和变为不活跃的仓库"""
+    parser = argparse.ArgumentParser(prog='check_tools.py history',
+                                     description='查询仓库健康历史记录')
+    parser.add_argument('--history-file', default=HISTORY_FILE, help=f'历史记录文件路径 (默认: {HISTORY_FILE})')
+    parser.add_argument('--stars', type=int, metavar='DAYS', default=HISTORY_TREND_DAYS,
+                        help=f'统计最近 DAYS 天的 Stars 增长 (默认: {HISTORY_TREND_DAYS})')
+    parser.add_argument('--inactive', type=int, metavar='DAYS', default=HISTORY_STATUS_DAYS,
+                        help=f'列出 DAYS 天前还活跃、现在不活跃的仓库 (默认: {HISTORY_STATUS_DAYS})')
+    parser.add_argument('--top', type=int, default=20, help='Stars 增长最多显示的仓库数 (默认: 20)')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出查询结果')
+    args = parser.parse_args(argv)
     
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_link = {
-            executor.submit(check_url, url, text): (text, url)
-            for text, url in links
-        }
-        
-        for i, future in enumerate(as_completed(future_to_link), 1):
-            result = future.result()
-            results.append(result)
-            
-            status_symbol = {
-                'success': f'{Colors.GREEN}✓{Colors.END}',
-                'warning': f'{Colors.YELLOW}⚠{Colors.END}',
-                'error': f'{Colors.RED}✗{Colors.END}'
-            }
-            
-            print(f"[{i}/{len(links)}] {status_symbol[result['status']]} {result['url']}")
+    if not os.path.exists(args.history_file):
+        print(f"{Colors.RED}✗ 历史记录文件不存在: {args.history_file}{Colors.END}")
+        return 2
     
-    return results
+    history = HistoryStore(args.history_file)
+    growth = history.star_growth(args.stars)[:args.top]
+    inactive = history.went_inactive(args.inactive)
+    history.close()
+    
+    if args.json:
+        json.dump({'star_growth': growth, 'went_inactive': inactive}, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+        return 0
+    
+    print(f"{Colors.CYAN}最近 {args.stars} 天 Stars 增长:{Colors.END}")
+    for c in growth:
+        print(f"  {c['repo']:<40} {c['stars_delta']:+6d}  (现 {c['stars']}, 自 {c['since']})")
+    if not growth:
+        print("  （无记录）")
+    
+    print(f"\n{Colors.CYAN}最近 {args.inactive} 天内变为不活跃的仓库:{Colors.END}")
+    for c in inactive:
+        print(f"  {c['repo']:<40} {c['old_status']} → {c['status']}  (最后推送: {c['pushed_at'] or 'N/A'})")
+    if not inactive:
+        print("  （无）")
+    return 0
 
 
-def check_github_repo(owner: str, repo: str) -> Dict:
-    """检查 GitHub 仓库状态"""
-    headers = {'User-Agent': USER_AGENT}
-    if GITHUB_TOKEN:
-        headers['Authorization'] = f'token {GITHUB_TOKEN}'
+class WatchScheduler:
+    """
+    监视模式的优先级队列
+    每个条目按陈旧程度、失败历史和波动性计算下次检查时间：
+    - 新条目立即检查
+    - 失败的条目从最短间隔开始复查，连续失败时间隔逐步放宽
+    - 成功的条目间隔随连续成功次数倍增，直到最长间隔
+    - 状态经常变化的条目按变化比例缩短间隔
+    到期时间相同时，上次检查更早的条目优先
+    """
+
+    def __init__(self, states: Dict[str, Dict] = None,
+                 min_interval: float = WATCH_MIN_INTERVAL, max_interval: float = WATCH_MAX_INTERVAL):
+        self.states: Dict[str, Dict] = dict(states or {})
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._heap: List[Tuple[float, float, str]] = []
+        self._due: Dict[str, float] = {}
+
+    def interval(self, state: Dict) -> float:
+        """根据失败历史和波动性计算复查间隔"""
+        if not state['ok']:
+            return min(self.max_interval, self.min_interval * 2 ** min(state['streak'] - 1, 16))
+        interval = min(self.max_interval, self.min_interval * 4 ** min(state['streak'], 16))
+        volatility = state['changes'] / state['checks']
+        return max(self.min_interval, interval * (1 - volatility))
+
+    def _push(self, key: str, due: float):
+        checked_at = self.states.get(key, {}).get('checked_at', 0.0)
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, checked_at, key))
+
+    def sync(self, keys: List[str]) -> List[str]:
+        """
+        使队列与当前条目一致：加入新条目，移除已不存在的条目
+        返回: 新加入且没有历史记录的条目
+        """
+        wanted = set(keys)
+        for key in list(self._due):
+            if key not in wanted:
+                del self._due[key]
+                self.states.pop(key, None)
+        return [key for key in keys if self.add(key)]
+
+    def add(self, key: str) -> bool:
+        """
+        加入一个条目：有历史记录的按复查间隔排队，否则立即到期
+        返回: 是否为没有历史记录的新条目
+        """
+        if key in self._due:
+            return False
+        state = self.states.get(key)
+        if state is None:
+            self._push(key, 0.0)
+            return True
+        self._push(key, state['checked_at'] + self.interval(state))
+        return False
+
+    def pop_due(self, now: float, limit: int) -> List[str]:
+        """取出最多 limit 个已到期的条目（过期的堆项直接丢弃）"""
+        keys = []
+        while self._heap and len(keys) < limit:
+            due, _, key = self._heap[0]
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            if self._due.get(key) == due:
+                del self._due[key]
+                keys.append(key)
+        return keys
+
+    def record(self, key: str, status: str, ok: bool, now: float) -> bool:
+        """
+        记录一次检查结果并重新排队
+        返回: 状态是否发生变化
+        """
+        state = self.states.get(key)
+        changed = state is None or state['status'] != status
+        if state is None:
+            state = {'checks': 0, 'changes': 0, 'streak': 0}
+            self.states[key] = state
+        elif changed:
+            state['changes'] += 1
+        state['streak'] = state['streak'] + 1 if not changed and state.get('ok') == ok else 1
+        state['checks'] += 1
+        state['status'] = status
+        state['ok'] = ok
+        state['checked_at'] = now
+        self._push(key, now + self.interval(state))
+        return changed
+
+    def next_due(self) -> float:
+        return min(self._due.values(), default=None)
+
+
+def run_watch(args, stream: NDJSONStream = None) -> int:
+    """
+    监视模式：常驻运行，结果保存在内存和清单文件中
+    - 按 WatchScheduler 的优先级每轮最多检查 --watch-batch 个到期条目，请求量保持平稳
+    - 输入文件变化时重新提取，新链接和仓库立即加入队列
+    - 结果变化后按防抖间隔重新生成报告
+    - 指定 stream 时每次检查的结果立即以 NDJSON 写出
+    """
+    manifest = load_manifest(args.manifest)
+    scheduler = WatchScheduler(manifest.get('schedule'))
+    previous_links = manifest['links']
+    previous_repos = manifest['repos']
     
-    try:
-        # 获取仓库基本信息
-        api_url = f'https://api.github.com/repos/{owner}/{repo}'
-        response = requests.get(api_url, headers=headers, timeout=TIMEOUT)
-        
-        if response.status_code == 404:
-            return {'status': 'not_found', 'message': '仓库不存在或已删除'}
-        elif response.status_code == 403:
-            return {'status': 'rate_limit', 'message': 'API 限制，请设置 GITHUB_TOKEN'}
-        elif response.status_code != 200:
-            return {'status': 'error', 'message': f'HTTP {response.status_code}'}
-        
-        data = response.json()
-        
-        # 检查是否归档
-        if data.get('archived'):
-            return {'status': 'archived', 'message': '仓库已归档'}
+    # 由调度器决定何时复查；缓存只用于条件请求，不再直接命中
+    if RESULT_CACHE:
+        RESULT_CACHE.max_age = 0
+    
+    link_targets: Dict[str, Dict] = {}  # 规范化目标 -> 结果
+    repo_by_key: Dict[Tuple[str, str], Dict] = {}
+    items = None
+    deferred = {}  # 仓库主页链接的规范化目标 -> 对应仓库条目
+    mtimes = None
+    dirty_since = None
+    last_change = 0.0
+    
+    def link_key(target: str) -> str:
+        return f'link\t{target}'
+    
+    def repo_key(name: str, url: str) -> str:
+        return f'repo\t{manifest_key(name, url)}'
+    
+    def rescan():
+        nonlocal items, deferred
+        items = collect_items(args.input, args.shard)
+        link_index = items.link_index
+        repos = list(dict.fromkeys(items.repos))
+        keys = []
         
-        # 获取最后提交时间
-        last_push = datetime.strptime(data['pushed_at'], '%Y-%m-%dT%H:%M:%SZ')
-        days_since_update = (datetime.now() - last_push).days
+        if not args.links_only:
+            for name, url in repos:
+                key = (name, url)
+                if not parse_github_url(url):
+                    continue
+                if key not in repo_by_key and manifest_key(name, url) in previous_repos:
+                    repo_by_key[key] = previous_repos[manifest_key(name, url)]
+                keys.append(repo_key(name, url))
         
-        # 获取最新 release
-        release_url = f'https://api.github.com/repos/{owner}/{repo}/releases/latest'
-        release_response = requests.get(release_url, headers=headers, timeout=TIMEOUT)
-        latest_release = None
-        if release_response.status_code == 200:
-            release_data = release_response.json()
-            latest_release = release_data.get('tag_name')
+        deferred = {}
+        if not args.repos_only:
+            repo_targets = {canonicalize_url(url): (name, url) for name, url in repos}
+            for text, url in link_index.targets(list(link_index.pairs())):
+                target = link_index.canonical(text, url)
+                if target not in link_targets and manifest_key(text, url) in previous_links:
+                    link_targets[target] = previous_links[manifest_key(text, url)]
+                # 仓库主页链接由仓库结果判定，仓库结果无法判定时再单独检查
+                if not args.links_only and target in repo_targets:
+                    deferred[target] = repo_targets[target]
+                    repo_result = repo_by_key.get(repo_targets[target])
+                    if repo_result is not None and repo_result_to_link_result(text, url, repo_result) is None:
+                        keys.append(link_key(target))
+                    continue
+                keys.append(link_key(target))
         
-        return {
-            'status': 'active' if days_since_update < 180 else 'inactive',
-            'stars': data.get('stargazers_count', 0),
-            'forks': data.get('forks_count', 0),
-            'license': data.get('license', {}).get('spdx_id', 'Unknown'),
-            'last_push': last_push.strftime('%Y-%m-%d'),
-            'days_since_update': days_since_update,
-            'latest_release': latest_release,
-            'message': 'OK'
-        }
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+        return scheduler.sync(keys)
+    
+    def collect_results() -> Tuple[List[Dict], List[Dict]]:
+        link_results = []
+        repo_results = []
+        if not args.links_only:
+            repo_results = ResultTable(RepoResult, (repo_by_key[key] for key in items.repos if key in repo_by_key))
+        if not args.repos_only:
+            link_index = items.link_index
+            target_results = []
+            for text, url in link_index.targets(list(link_index.pairs())):
+                target = link_index.canonical(text, url)
+                repo_result = repo_by_key.get(deferred[target]) if target in deferred else None
+                link_result = repo_result_to_link_result(text, url, repo_result) if repo_result else None
+                if link_result is None:
+                    link_result = link_targets.get(target)
+                if link_result is not None:
+                    target_results.append(LinkResult.from_dict(link_result, url=url, text=text))
+            link_results = ResultTable(LinkResult, link_index.fan_out(target_results, list(link_index.pairs())))
+        return link_results, repo_results
+    
+    def write_reports():
+        link_results, repo_results = collect_results()
+        if not args.repos_only and 'md' in args.report:
+            generate_link_report_md(link_results, 'link_check_report.md')
+        if (link_results or repo_results) and 'html' in args.report:
+            generate_html_report(link_results, repo_results, 'health_report.html', METRICS,
+                                 HISTORY.trends() if HISTORY else None)
+        write_machine_reports(args, link_results, repo_results, ndjson=stream is None)
+        manifest['schedule'] = scheduler.states
+        save_manifest(args.manifest, manifest,
+                      None if args.repos_only else link_results,
+                      None if args.links_only else repo_results)
+        print(f"{Colors.GREEN}✓ [{datetime.now().strftime('%H:%M:%S')}] 报告已更新: "
+              f"{len(link_results)} 条链接, {len(repo_results)} 个仓库{Colors.END}")
+        return link_results, repo_results
+    
+    print(f"{Colors.CYAN}监视模式: 每 {WATCH_POLL_INTERVAL} 秒最多检查 {args.watch_batch} 个到期条目，"
+          f"按 Ctrl+C 退出{Colors.END}\n")
+    try:
+        while True:
+            now = time.time()
+            
+            # 输入文件变化时重新提取，新条目立即排队
+            current = {}
+            for path in iter_markdown_files(args.input):
+                try:
+                    current[path] = os.stat(path).st_mtime
+                except OSError:
+                    pass
+            if current != mtimes:
+                new_keys = rescan()
+                if mtimes is not None:
+                    print(f"检测到输入文件变化，{len(new_keys)} 个新条目已加入队列")
+                    dirty_since = dirty_since or now
+                    last_change = now
+                mtimes = current
+            
+            due = scheduler.pop_due(now, args.watch_batch)
+            due_links = []
+            due_repos = []
+            for key in due:
+                kind, _, rest = key.partition('\t')
+                if kind == 'repo':
+                    due_repos.append(tuple(rest.split('\t', 1)))
+                else:
+                    due_links.append(rest)
+            
+            changed = False
+            if due_repos:
+                # 每轮重新计算速率限制的累计等待，上一轮放弃等待不影响之后的复查
+                GITHUB_SCHEDULER.reset_wait()
+                checked_repos = check_github_repos(due_repos, backend=args.github_backend)
+                if HISTORY:
+                    HISTORY.record_run(checked_repos)
+                for result in checked_repos:
+                    repo_by_key[(result['name'], result['url'])] = result
+                    changed |= scheduler.record(repo_key(result['name'], result['url']), result['status'],
+                                                result['status'] in (Status.ACTIVE, Status.INACTIVE, Status.ARCHIVED), now)
+                    if stream:
+                        stream.write('repo', result)
+                # 用仓库结果判定主页链接，无法判定的改为单独检查
+                checked = {(name, url) for name, url in due_repos}
+                write_link = stream.link_writer(items.link_index, list(items.link_index.pairs())) if stream else None
+                for (text, url) in items.link_index.targets(list(items.link_index.pairs())):
+                    target = items.link_index.canonical(text, url)
+                    if deferred.get(target) not in checked or repo_by_key.get(deferred[target]) is None:
+                        continue
+                    link_result = repo_result_to_link_result(text, url, repo_by_key[deferred[target]])
+                    if link_result is None:
+                        scheduler.add(link_key(target))
+                    elif write_link:
+                        write_link(link_result)
+            if due_links:
+                link_index = items.link_index
+                representatives = {link_index.canonical(*pair): pair
+                                   for pair in link_index.targets(list(link_index.pairs()))}
+                targets = [representatives[target] for target in due_links if target in representatives]
+                write_link = stream.link_writer(link_index, list(link_index.pairs())) if stream else None
+                # 每轮重新计算熔断：上一轮熔断的主机不能让之后的复查一直判定为不可达
+                CIRCUIT_BREAKER.reset()
+                if args.engine == 'async':
+                    results = check_links_async(targets, args.concurrency, args.per_host, on_result=write_link)
+                else:
+                    results = check_links_parallel(targets, on_result=write_link)
+                for result in results:
+                    target = canonicalize_url(result['url'])
+                    link_targets[target] = result
+                    changed |= scheduler.record(link_key(target), result['status'],
+                                                result['status'] == Status.SUCCESS, now)
+            
+            if changed:
+                dirty_since = dirty_since or now
+                last_change = now
+            
+            # 防抖：静默 WATCH_REPORT_DEBOUNCE 秒后生成报告，持续变化时最多推迟 WATCH_REPORT_MAX_DELAY 秒
+            if dirty_since is not None and (now - last_change >= WATCH_REPORT_DEBOUNCE
+                                            or now - dirty_since >= WATCH_REPORT_MAX_DELAY):
+                write_reports()
+                dirty_since = None
+            
+            if not due or len(due) < args.watch_batch:
+                time.sleep(WATCH_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.CYAN}停止监视，保存最终报告...{Colors.END}")
+    
+    link_results, repo_results = write_reports()
+    SESSION_MANAGER.close()
+    if RESULT_CACHE:
+        RESULT_CACHE.close()
+    if HISTORY:
+        HISTORY.close()
+    return exit_code(link_results, repo_results)
 
 
-def check_github_repos(repos: List[Tuple[str, str]]) -> List[Dict]:
-    """检查所有 GitHub 仓库"""
-    results = []
-    
-    for i, (name, url) in enumerate(repos, 1):
-        # 解析 owner/repo
-        match = re.match(r'https://github\.com/([^/]+)/([^/]+)', url)
+IMPORT_TIME_PATTERN = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def import_time_breakdown() -> List[Tuple[str, float, float]]:
+    """
+    在新的解释器中以 -X importtime 导入本模块
+    返回 [(模块, 自身耗时, 累计耗时)]（秒），按累计耗时降序；第一项为本模块
+    """
+    module_dir, module_file = os.path.split(os.path.abspath(__file__))
+    module = os.path.splitext(module_file)[0]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [module_dir, os.environ.get('PYTHONPATH')])))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, env=env)
+    # -X importtime 按导入完成顺序输出，子模块在父模块之前；只保留本模块及其引入的模块，忽略解释器启动部分
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
         if not match:
             continue
-        
-        owner, repo = match.groups()
-        print(f"[{i}/{len(repos)}] 检查 {name} ({owner}/{repo})...")
-        
-        result = check_github_repo(owner, repo)
-        result['name'] = name
-        result['url'] = url
-        results.append(result)
-        
-        # 显示状态
-        if result['status'] == 'active':
-            print(f"  {Colors.GREEN}✓ 活跃{Colors.END} - {result.get('stars', 0)} stars, 最后更新: {result.get('last_push')}")
-        elif result['status'] == 'inactive':
-            print(f"  {Colors.YELLOW}⚠ 不活跃{Colors.END} - {result['days_since_update']} 天未更新")
-        elif result['status'] == 'archived':
-            print(f"  {Colors.RED}✗ 已归档{Colors.END}")
-        else:
-            print(f"  {Colors.RED}✗ {result['message']}{Colors.END}")
-        
-        time.sleep(0.5)  # 避免 API 限制
-    
-    return results
+        rows.append((match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6))
+        if not match.group(3):
+            if match.group(4) == module:
+                rows.sort(key=lambda row: (row[0] != module, -row[2]))
+                return rows
+            rows = []
+    return []
 
 
-def generate_link_report_md(results: List[Dict], filename: str):
-    """生成链接检查的 Markdown 报告"""
-    success_count = sum(1 for r in results if r['status'] == 'success')
-    warning_count = sum(1 for r in results if r['status'] == 'warning')
-    error_count = sum(1 for r in results if r['status'] == 'error')
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write("# 链接校验报告\n\n")
-        f.write(f"**生成时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        f.write("## 统计\n\n")
-        f.write(f"- 总计: {len(results)} 个链接\n")
-        f.write(f"- ✅ 成功: {success_count}\n")
-        f.write(f"- ⚠️ 警告: {warning_count}\n")
-        f.write(f"- ❌ 失败: {error_count}\n\n")
-        
-        if error_count > 0:
-            f.write("## ❌ 失败的链接\n\n")
-            for r in results:
-                if r['status'] == 'error':
-                    f.write(f"- [{r['text']}]({normalize_url(r['url'])}) - {r['message']}\n")
-            f.write("\n")
-        
-        if warning_count > 0:
-            f.write("## ⚠️ 警告的链接\n\n")
-            for r in results:
-                if r['status'] == 'warning':
-                    f.write(f"- [{r['text']}]({normalize_url(r['url'])}) - {r['message']}\n")
-            f.write("\n")
-        
-        if success_count > 0:
-            f.write("## ✅ 成功的链接\n\n")
-            for r in results:
-                if r['status'] == 'success':
-                    f.write(f"- [{r['text']}]({normalize_url(r['url'])}) - {r['message']}\n")
-            f.write("\n")
+def peak_rss_mb() -> float:
+    """当前进程的峰值 RSS（MB），Linux 上 ru_maxrss 单位为 KB，macOS 为字节；不支持的平台返回 None"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss /= 1024
+    return round(maxrss / 1024, 1)
 
 
-def generate_html_report(link_results: List[Dict], repo_results: List[Dict], output_file: str):
-    """生成综合 HTML 报告"""
-    html = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>数据标注工具健康检查报告</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-        .container {{ max-width: 1400px; margin: 0 auto; }}
-        h1 {{ color: #333; margin-bottom: 10px; }}
-        .timestamp {{ color: #666; margin-bottom: 30px; }}
-        .section {{ background: white; padding: 25px; border-radius: 8px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        .summary {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; }}
-        .summary-item {{ padding: 15px; border-radius: 6px; text-align: center; }}
-        .summary-item h3 {{ margin: 0 0 10px 0; font-size: 14px; color: #666; }}
-        .summary-item .number {{ font-size: 32px; font-weight: bold; margin: 0; }}
-        .success {{ background: #d4edda; color: #155724; }}
-        .warning {{ background: #fff3cd; color: #856404; }}
-        .danger {{ background: #f8d7da; color: #721c24; }}
-        .info {{ background: #d1ecf1; color: #0c5460; }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background: #4CAF50; color: white; position: sticky; top: 0; }}
-        tr:hover {{ background: #f5f5f5; }}
-        .status-badge {{ padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: bold; }}
-        .badge-active {{ background: #28a745; color: white; }}
-        .badge-inactive {{ background: #ffc107; color: #333; }}
-        .badge-archived {{ background: #dc3545; color: white; }}
-        .badge-error {{ background: #6c757d; color: white; }}
-        .badge-success {{ background: #28a745; color: white; }}
-        .badge-warning {{ background: #ffc107; color: #333; }}
-        a {{ color: #007bff; text-decoration: none; }}
-        a:hover {{ text-decoration: underline; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>📊 数据标注工具健康检查报告</h1>
-        <p class="timestamp">生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        
-        <div class="section">
-            <h2>📈 链接检查统计</h2>
-            <div class="summary">
-                <div class="summary-item success">
-                    <h3>✅ 成功</h3>
-                    <p class="number">{sum(1 for r in link_results if r.get('status') == 'success')}</p>
-                </div>
-                <div class="summary-item warning">
-                    <h3>⚠️ 警告</h3>
-                    <p class="number">{sum(1 for r in link_results if r.get('status') == 'warning')}</p>
-                </div>
-                <div class="summary-item danger">
-                    <h3>❌ 失败</h3>
-                    <p class="number">{sum(1 for r in link_results if r.get('status') == 'error')}</p>
-                </div>
-                <div class="summary-item info">
-                    <h3>📊 总计</h3>
-                    <p class="number">{len(link_results)}</p>
-                </div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>🔧 GitHub 仓库健康状态</h2>
-            <div class="summary">
-                <div class="summary-item success">
-                    <h3>✅ 活跃</h3>
-                    <p class="number">{sum(1 for r in repo_results if r.get('status') == 'active')}</p>
-                </div>
-                <div class="summary-item warning">
-                    <h3>⚠️ 不活跃</h3>
-                    <p class="number">{sum(1 for r in repo_results if r.get('status') == 'inactive')}</p>
-                </div>
-                <div class="summary-item danger">
-                    <h3>🔴 归档</h3>
-                    <p class="number">{sum(1 for r in repo_results if r.get('status') == 'archived')}</p>
-                </div>
-                <div class="summary-item danger">
-                    <h3>❌ 错误</h3>
-                    <p class="number">{sum(1 for r in repo_results if r.get('status') in ['not_found', 'error'])}</p>
-                </div>
-            </div>
-            
-            <table>
-                <thead>
-                    <tr>
-                        <th>工具名称</th>
-                        <th>状态</th>
-                        <th>⭐ Stars</th>
-                        <th>🍴 Forks</th>
-                        <th>📅 最后更新</th>
-                        <th>🏷️ 最新版本</th>
-                        <th>📜 协议</th>
-                        <th>说明</th>
-                    </tr>
-                </thead>
-                <tbody>
-"""
-    
-    for result in repo_results:
-        status_map = {
-            'active': 'badge-active',
-            'inactive': 'badge-inactive',
-            'archived': 'badge-archived',
-            'not_found': 'badge-error',
-            'error': 'badge-error'
-        }
-        badge_class = status_map.get(result['status'], 'badge-error')
-        
-        html += f"""                    <tr>
-                        <td><a href="{result['url']}" target="_blank">{result['name']}</a></td>
-                        <td><span class="status-badge {badge_class}">{result['status'].upper()}</span></td>
-                        <td>{result.get('stars', 'N/A')}</td>
-                        <td>{result.get('forks', 'N/A')}</td>
-                        <td>{result.get('last_push', 'N/A')}</td>
-                        <td>{result.get('latest_release', 'N/A')}</td>
-                        <td>{result.get('license', 'N/A')}</td>
-                        <td>{result.get('message', '')}</td>
-                    </tr>
-"""
-    
-    html += """                </tbody>
-            </table>
-        </div>
-"""
+def print_profile(profiler):
+    """--profile 输出：启动导入耗时、运行中的延迟导入、最耗时的函数和峰值内存"""
+    print(f"\n{Colors.CYAN}{'='*80}{Colors.END}")
+    print(f"{Colors.CYAN}性能分析{Colors.END}")
+    print(f"{Colors.CYAN}{'='*80}{Colors.END}\n")
     
-    # 添加失败的链接表格
-    failed_links = [r for r in link_results if r['status'] == 'error']
-    if failed_links:
-        html += """
-        <div class="section">
-            <h2>❌ 失败的链接</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>链接文本</th>
-                        <th>URL</th>
-                        <th>错误信息</th>
-                    </tr>
-                </thead>
-                <tbody>
-"""
-        for link in failed_links:
-            html += f"""                    <tr>
-                        <td>{link['text']}</td>
-                        <td><a href="{normalize_url(link['url'])}" target="_blank">{link['url']}</a></td>
-                        <td>{link['message']}</td>
-                    </tr>
-"""
-        html += """                </tbody>
-            </table>
-        </div>
-"""
+    imports = import_time_breakdown()
+    if imports:
+        module, _, total = imports[0]
+        print(f"启动导入 {module}: {total * 1000:.1f} ms，其中耗时最多的模块:")
+        for name, own, cumulative in imports[1:PROFILE_TOP_IMPORTS + 1]:
+            print(f"  {name:<40} 自身 {own * 1000:>7.1f} ms  累计 {cumulative * 1000:>7.1f} ms")
+    if IMPORT_TIMES:
+        print("\n运行中延迟导入:")
+        for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {name:<40} {seconds * 1000:>7.1f} ms")
     
-    html += """    </div>
-</body>
-</html>"""
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"\n峰值内存 (RSS): {rss} MB")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    print(f"\n累计耗时最多的 {PROFILE_TOP_FUNCTIONS} 个函数:")
+    stats = pstats.Stats(profiler, stream=sys.stdout)
+    stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+
+
+def profiled(func: Callable[..., int]) -> Callable[..., int]:
+    """包装 func：在 cProfile 下执行，结束后（包括出错时）输出性能分析"""
+    def wrapper(*args, **kwargs) -> int:
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            print_profile(profiler)
+    return wrapper
 
 
 def main():
-    parser = argparse.ArgumentParser(description='数据标注工具健康检查脚本')
+    if sys.argv[1:2] == ['merge']:
+        return merge_main(sys.argv[2:])
+    if sys.argv[1:2] == ['history']:
+        return history_main(sys.argv[2:])
+    
+    parser = argparse.ArgumentParser(description='数据标注工具健康检查脚本',
+                                     epilog='合并分片结果: check_tools.py merge shard-*.json；'
+                                            '查询历史趋势: check_tools.py history')
     parser.add_argument('--links-only', action='store_true', help='仅检查链接有效性')
     parser.add_argument('--repos-only', action='store_true', help='仅检查 GitHub 仓库状态')
-    parser.add_argument('--input', default='README.md', help='输入的 Markdown 文件 (默认: README.md)')
+    parser.add_argument('--input', nargs='+', default=['README.md'],
+                        help='输入的 Markdown 文件、目录或通配符，可指定多个 (默认: README.md)')
     parser.add_argument('--token', help='GitHub API Token (可选，用于提高 API 限制)')
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread',
+                        help='链接检查引擎: thread (线程池) 或 async (asyncio + aiohttp) (默认: thread)')
+    parser.add_argument('--concurrency', type=int, default=ASYNC_MAX_CONCURRENCY,
+                        help=f'异步引擎全局并发上限 (默认: {ASYNC_MAX_CONCURRENCY})')
+    parser.add_argument('--per-host', type=int, default=ASYNC_PER_HOST_LIMIT,
+                        help=f'异步引擎单个主机并发上限 (默认: {ASYNC_PER_HOST_LIMIT})')
+    parser.add_argument('--pool-size', type=int, default=POOL_MAXSIZE,
+                        help=f'每个主机保持的 keep-alive 连接数 (默认: {POOL_MAXSIZE})')
+    parser.add_argument('--no-keep-alive', action='store_true', help='禁用连接复用（每个请求新建连接）')
+    parser.add_argument('--fallback', choices=['stream', 'range'], default=FALLBACK_MODE,
+                        help=f'HEAD 失败后的有限 GET 方式: stream (最多读取 --fallback-bytes 字节) '
+                             f'或 range (Range: bytes=0-0) (默认: {FALLBACK_MODE})')
+    parser.add_argument('--fallback-bytes', type=int, default=FALLBACK_MAX_BYTES,
+                        help=f'stream 模式下最多读取的响应体字节数 (默认: {FALLBACK_MAX_BYTES})')
+    parser.add_argument('--no-dns-preflight', action='store_true',
+                        help='不在检查前并行预解析主机名（默认预解析，域名不存在的链接直接判定失败）')
+    parser.add_argument('--retries', type=int, default=RETRY_ATTEMPTS,
+                        help=f'超时、连接失败、429、5xx 的重试次数 (默认: {RETRY_ATTEMPTS})')
+    parser.add_argument('--breaker-threshold', type=int, default=CIRCUIT_BREAKER_THRESHOLD,
+                        help=f'同一主机连续多少个 URL 失败后熔断，0 表示不熔断 (默认: {CIRCUIT_BREAKER_THRESHOLD})')
+    parser.add_argument('--breaker-cooldown', type=float, default=CIRCUIT_BREAKER_COOLDOWN,
+                        help=f'熔断多少秒后放行一个探测请求，成功则恢复 (默认: {CIRCUIT_BREAKER_COOLDOWN})')
+    parser.add_argument('--max-rate-wait', type=float, default=RATE_LIMIT_MAX_WAIT,
+                        help=f'因 GitHub API 速率限制累计等待的上限（秒），超过后剩余仓库标记为 rate_limit，'
+                             f'0 表示不限制 (默认: {RATE_LIMIT_MAX_WAIT})')
+    parser.add_argument('--github-backend', choices=['rest', 'graphql'], default='rest',
+                        help='仓库检查后端: rest (并发 REST 查询) 或 graphql (批量查询，需要 Token) (默认: rest)')
+    parser.add_argument('--no-cache', action='store_true', help=f'禁用结果缓存 ({CACHE_FILE})')
+    parser.add_argument('--max-age', type=int, help='缓存有效期上限（秒），覆盖各状态的默认 TTL')
+    parser.add_argument('--cache-file', default=CACHE_FILE, help=f'缓存文件路径 (默认: {CACHE_FILE})')
+    parser.add_argument('--no-history', action='store_true', help=f'不记录仓库健康历史 ({HISTORY_FILE})')
+    parser.add_argument('--history-file', default=HISTORY_FILE, help=f'历史记录文件路径 (默认: {HISTORY_FILE})')
+    parser.add_argument('--report', type=parse_reports, default=DEFAULT_REPORTS,
+                        help=f'要生成的报告，逗号分隔的 {",".join(REPORT_FORMATS)}，none 表示不生成；'
+                             f'json 未指定 --json 时写入 {JSON_REPORT_FILE} (默认: {DEFAULT_REPORTS})')
+    parser.add_argument('--json', metavar='FILE', help='额外输出 JSON 格式的结果报告')
+    parser.add_argument('--ndjson', metavar='FILE', help='额外输出 NDJSON 格式的结果（每行一条）')
+    parser.add_argument('--junit', metavar='FILE', help='额外输出 JUnit XML 报告，便于 CI 展示')
+    parser.add_argument('--metrics', metavar='FILE', action='append',
+                        help='导出请求耗时指标，.json 为 JSON，其他扩展名为 Prometheus 文本格式，可重复指定')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：仅检查相对上次运行新增、修改或上次未通过的链接和仓库，其余沿用清单中的结果')
+    parser.add_argument('--since', metavar='REV',
+                        help='增量模式下用 git diff 判断修改的行，如 origin/main 或 A..B')
+    parser.add_argument('--manifest', default=MANIFEST_FILE, help=f'增量模式清单文件 (默认: {MANIFEST_FILE})')
+    parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                        help='只检查第 I 个分片（共 N 个，按主机哈希划分），输出原始结果供 merge 子命令合并')
+    parser.add_argument('--shard-output', metavar='FILE',
+                        help='分片结果文件 (默认: shard-I-of-N.json)')
+    parser.add_argument('--watch', action='store_true',
+                        help='监视模式：常驻运行，按陈旧程度、失败历史和波动性调度复查，'
+                             '输入文件变化时立即检查新条目，结果保存在 --manifest 中')
+    parser.add_argument('--watch-batch', type=int, default=WATCH_BATCH_SIZE,
+                        help=f'监视模式每 {WATCH_POLL_INTERVAL} 秒最多检查的条目数 (默认: {WATCH_BATCH_SIZE})')
+    
+    parser.add_argument('--no-progress', action='store_true', help='不打印逐条检查进度')
+    parser.add_argument('--profile', action='store_true',
+                        help='结束后输出导入耗时、cProfile 热点函数和峰值内存，用于分析启动和运行开销')
     
     args = parser.parse_args()
     
+    run = profiled(run_checks) if args.profile else run_checks
+    
+    # NDJSON 在运行中逐条写出；--ndjson - 时 stdout 专用于结果流，其余输出改写到 stderr
+    if args.ndjson == '-':
+        stream = NDJSONStream(sys.stdout)
+        with contextlib.redirect_stdout(sys.stderr):
+            return run(args, stream)
+    if args.ndjson:
+        with open(args.ndjson, 'w', encoding='utf-8') as f:
+            return run(args, NDJSONStream(f))
+    return run(args)
+
+
+def run_checks(args, stream: NDJSONStream = None) -> int:
+    """按命令行参数执行检查并生成报告，返回退出码"""
+    global FALLBACK_MODE, FALLBACK_MAX_BYTES, RETRY_ATTEMPTS, SHOW_PROGRESS
+    
+    if args.engine == 'async' and aiohttp is None:
+        print(f"{Colors.RED}✗ --engine async 需要 aiohttp，请先执行: pip install aiohttp{Colors.END}")
+        return 2
+    
     if args.token:
         global GITHUB_TOKEN
         GITHUB_TOKEN = args.token
     
+    if args.github_backend == 'graphql' and not GITHUB_TOKEN:
+        print(f"{Colors.RED}✗ --github-backend graphql 需要 --token{Colors.END}")
+        return 2
+    
+    FALLBACK_MODE = args.fallback
+    FALLBACK_MAX_BYTES = args.fallback_bytes
+    RETRY_ATTEMPTS = args.retries
+    SHOW_PROGRESS = not args.no_progress
+    CIRCUIT_BREAKER.threshold = args.breaker_threshold
+    CIRCUIT_BREAKER.cooldown = args.breaker_cooldown
+    GITHUB_SCHEDULER.max_wait = args.max_rate_wait
+    
+    global SESSION_MANAGER
+    SESSION_MANAGER = SessionManager(pool_maxsize=args.pool_size, keep_alive=not args.no_keep_alive)
+    
+    global RESULT_CACHE
+    if not args.no_cache:
+        RESULT_CACHE = ResultCache(args.cache_file, max_age=args.max_age)
+    
+    global HISTORY
+    if not args.no_history and not args.links_only:
+        HISTORY = HistoryStore(args.history_file)
+    
     link_results = []
     repo_results = []
     
-    # 检查链接
+    if args.watch:
+        return run_watch(args, stream)
+    
+    # 单遍提取所有输入文件中的链接和仓库
+    link_index, repos, repo_locations, link_order, repo_order = collect_items(args.input, args.shard)
+    link_count = sum(len(locations) for locations in link_index.pairs().values())
+    
+    if args.shard:
+        print(f"分片 {args.shard[0]}/{args.shard[1]}: 分配到 {link_count} 个链接, {len(repos)} 个仓库\n")
+    
+    # 增量模式：读取上次清单，并按需解析 git 修改范围
+    manifest = None
+    changed_lines = None
+    if args.incremental:
+        manifest = load_manifest(args.manifest)
+        if args.since:
+            try:
+                changed_lines = git_changed_lines(args.since, list(iter_markdown_files(args.input)))
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"{Colors.YELLOW}⚠ 无法读取 git 修改范围 ({e})，改为与清单比较内容{Colors.END}\n")
+    
+    # 准备链接检查：增量拆分、按规范化目标去重、把仓库主页链接交给仓库检查判定
+    deferred_links = []
+    live_pairs = []
+    targets = []
+    reused_link_results = []
     if not args.repos_only:
-        print(f"{Colors.CYAN}{'='*80}{Colors.END}")
-        print(f"{Colors.CYAN}开始检查链接有效性...{Colors.END}")
-        print(f"{Colors.CYAN}{'='*80}{Colors.END}\n")
+        print(f"找到 {link_count} 个链接")
         
-        links = extract_all_links(args.input)
-        print(f"找到 {len(links)} 个链接\n")
+        live_pairs = list(link_index.pairs())
+        reused_links = {}
+        if manifest is not None:
+            live_pairs, reused_links = split_incremental(live_pairs, link_index.pairs(),
+                                                         manifest['links'], changed_lines)
+            print(f"增量模式: 检查 {len(live_pairs)} 个新增、修改或上次未通过的链接, 复用 {len(reused_links)} 个上次结果")
         
-        # 去重
-        unique_links = list(set(links))
-        if len(unique_links) < len(links):
-            print(f"去重后: {len(unique_links)} 个唯一链接\n")
+        # 去重：每个规范化目标只检查一次
+        targets = link_index.targets(live_pairs)
+        if len(targets) < len(live_pairs):
+            print(f"去重后: {len(targets)} 个唯一目标")
         
-        link_results = check_links_parallel(unique_links)
+        # 仓库主页链接交给仓库检查，通过 API 结果判定
+        if not args.links_only:
+            repo_targets = {canonicalize_url(url) for _, url in repos}
+            deferred_links = [t for t in targets if link_index.canonical(*t) in repo_targets]
+            targets = [t for t in targets if link_index.canonical(*t) not in repo_targets]
+            if deferred_links:
+                print(f"{len(deferred_links)} 个 GitHub 仓库链接将由仓库检查结果判定")
         
-        # 生成链接报告
-        generate_link_report_md(link_results, 'link_check_report.md')
-        print(f"\n{Colors.GREEN}✓ 链接检查报告已保存: link_check_report.md{Colors.END}\n")
+        for (text, url), result in reused_links.items():
+            reused_link_results.append(LinkResult.from_dict(result, locations=link_index.pairs()[(text, url)]))
     
-    # 检查 GitHub 仓库
-    if not args.links_only:
-        print(f"{Colors.CYAN}{'='*80}{Colors.END}")
-        print(f"{Colors.CYAN}开始检查 GitHub 仓库状态...{Colors.END}")
-        print(f"{Colors.CYAN}{'='*80}{Colors.END}\n")
+    # 预先并行解析所有主机名，不存在的域名在检查时直接判定失败
+    if targets and not args.no_dns_preflight:
+        preflight = dns_preflight(targets + deferred_links)
+        if preflight:
+            print(f"DNS 预解析: {preflight['hosts']} 个主机, 耗时 {preflight['seconds']:.2f}s "
+                  f"(成功 {preflight['resolved']}, 域名不存在 {preflight['nxdomain']}, "
+                  f"暂时失败 {preflight['failed']})")
+    
+    aggregator = ResultAggregator(deferred_links)
+    if stream:
+        aggregator.on_link = stream.link_writer(link_index, live_pairs)
+        aggregator.on_repo = stream.repo_writer()
+        for result in reused_link_results:
+            stream.write('link', result)
+    
+    def check_links(links: List[Tuple[str, str]]):
+        """按 --engine 选择的引擎检查链接，结果交给汇总器"""
+        if args.engine == 'async':
+            check_links_async(links, args.concurrency, args.per_host, on_result=aggregator.add_link)
+        else:
+            check_links_parallel(links, on_result=aggregator.add_link)
+    
+    def run_repo_phase() -> List[Dict]:
+        """仓库检查：在后台线程中与链接检查同时运行，结果实时交给汇总器"""
+        if manifest is None:
+            checked = check_github_repos(repos, backend=args.github_backend, on_result=aggregator.add_repo)
+            if HISTORY:
+                HISTORY.record_run(checked)
+            return checked
         
-        repos = extract_github_repos(args.input)
-        print(f"找到 {len(repos)} 个 GitHub 仓库\n")
+        live_repos, reused_repos = split_incremental(list(dict.fromkeys(repos)), repo_locations,
+                                                     manifest['repos'], changed_lines)
+        print(f"增量模式: 检查 {len(live_repos)} 个新增、修改或上次未通过的仓库, 复用 {len(reused_repos)} 个上次结果")
+        for result in reused_repos.values():
+            aggregator.add_repo(result)
+        checked = check_github_repos(live_repos, backend=args.github_backend, on_result=aggregator.add_repo)
+        # 历史只记录本次实际检查的仓库，复用的清单结果不是新的观测
+        if HISTORY and checked:
+            HISTORY.record_run(checked)
+        live_results = {(r['name'], r['url']): r for r in checked}
+        live_results.update(reused_repos)
+        return [RepoResult.from_dict(live_results[key]) for key in repos if key in live_results]
+    
+    # 链接和仓库两条流水线同时运行，各自使用独立的并发配额（MAX_WORKERS / GITHUB_MAX_WORKERS）
+    print(f"\n{Colors.CYAN}{'='*80}{Colors.END}")
+    if not args.links_only:
+        print(f"{Colors.CYAN}开始检查 GitHub 仓库状态 ({len(repos)} 个)...{Colors.END}")
+    if not args.repos_only:
+        print(f"{Colors.CYAN}开始检查链接有效性 ({len(targets)} 个目标)...{Colors.END}")
+    print(f"{Colors.CYAN}{'='*80}{Colors.END}\n")
+    
+    with futures.ThreadPoolExecutor(max_workers=1) as phase_executor:
+        repo_future = None if args.links_only else phase_executor.submit(run_repo_phase)
         
-        repo_results = check_github_repos(repos)
+        if not args.repos_only:
+            check_links(targets)
         
+        if repo_future is not None:
+            repo_results = repo_future.result()
+    
+    if not args.links_only:
         # 显示警告
-        warnings = [r for r in repo_results if r['status'] in ['inactive', 'archived', 'not_found', 'error']]
+        warnings = list(filter_status(repo_results, Status.INACTIVE, Status.ARCHIVED, Status.NOT_FOUND, Status.ERROR))
         if warnings:
             print(f"\n{Colors.YELLOW}⚠️ 发现 {len(warnings)} 个需要关注的工具：{Colors.END}")
             for w in warnings:
                 print(f"  - {w['name']}: {w['status']} - {w.get('message', '')}")
     
-    # 生成综合 HTML 报告
-    if link_results or repo_results:
-        generate_html_report(link_results, repo_results, 'health_report.html')
+    if not args.repos_only:
+        # 仓库结果无法判定的仓库主页链接再在线检查
+        unresolved = aggregator.pending_links()
+        if unresolved:
+            print(f"\n在线检查 {len(unresolved)} 个无法由仓库结果判定的链接\n")
+            check_links(unresolved)
+        
+        # 把每个目标的结果分发回所有出现位置
+        link_results = link_index.fan_out(aggregator.link_results, live_pairs) + reused_link_results
+        
+        # 生成链接报告（分片运行时由 merge 统一生成）
+        if not args.shard and 'md' in args.report:
+            generate_link_report_md(link_results, 'link_check_report.md')
+            print(f"\n{Colors.GREEN}✓ 链接检查报告已保存: link_check_report.md{Colors.END}\n")
+    
+    # 报告阶段使用列式容器：按状态计数、过滤只遍历一次状态列
+    link_results = ResultTable(LinkResult, link_results)
+    repo_results = ResultTable(RepoResult, repo_results)
+    
+    if manifest is not None:
+        save_manifest(args.manifest, manifest,
+                      None if args.repos_only else link_results,
+                      None if args.links_only else repo_results)
+    
+    if args.shard:
+        # 分片运行只输出原始结果，由 merge 子命令生成完整报告
+        shard_output = args.shard_output or f'shard-{args.shard[0]}-of-{args.shard[1]}.json'
+        save_shard_results(shard_output, args.shard, link_results, repo_results, link_order, repo_order)
+        print(f"\n{Colors.GREEN}✓ 分片结果已保存: {shard_output}{Colors.END}")
+    elif (link_results or repo_results) and 'html' in args.report:
+        # 生成综合 HTML 报告
+        generate_html_report(link_results, repo_results, 'health_report.html', METRICS,
+                             HISTORY.trends() if HISTORY else None)
         print(f"\n{Colors.GREEN}✓ 综合健康报告已生成: health_report.html{Colors.END}")
     
-    # 返回退出码
-    error_count = sum(1 for r in link_results if r['status'] == 'error')
-    error_count += sum(1 for r in repo_results if r['status'] in ['not_found', 'error'])
+    # 机器可读报告
+    write_machine_reports(args, link_results, repo_results, ndjson=stream is None)
     
-    return 0 if error_count == 0 else 1
+    for filename in args.metrics or []:
+        with open(filename, 'w', encoding='utf-8') as f:
+            if filename.endswith('.json'):
+                json.dump(METRICS.to_json(), f, ensure_ascii=False, indent=1)
+            else:
+                f.write(METRICS.to_prometheus())
+        print(f"{Colors.GREEN}✓ 耗时指标已保存: {filename}{Colors.END}")
+    
+    # 连接复用统计
+    pool_stats = SESSION_MANAGER.stats()
+    if pool_stats['requests']:
+        print(f"\n连接复用: {pool_stats['requests']} 次请求 / {pool_stats['hosts']} 个主机, "
+              f"新建连接 {pool_stats['new_connections']}, 复用 {pool_stats['reused_connections']}")
+    if CIRCUIT_BREAKER.open_hosts():
+        print(f"已熔断的主机: {', '.join(CIRCUIT_BREAKER.open_hosts())}")
+    if HEAD_REJECTING_HOSTS:
+        print(f"不支持 HEAD 的主机: {len(HEAD_REJECTING_HOSTS)} 个（已直接使用有限 GET）")
+    SESSION_MANAGER.close()
+    
+    if RESULT_CACHE:
+        print(f"结果缓存: 命中 {RESULT_CACHE.hits}, 304 重新验证 {RESULT_CACHE.revalidated}, 未命中 {RESULT_CACHE.misses}")
+        RESULT_CACHE.close()
+    if HISTORY:
+        HISTORY.close()
+    
+    # 返回退出码
+    return exit_code(link_results, repo_results)
 
 
 if __name__ == '__main__':
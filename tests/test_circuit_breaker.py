@@ -0,0 +1,94 @@
+"""
+熔断器测试：主机接受连接但从不响应时，两种引擎都应在少量 URL 超时后熔断，其余 URL 直接判定为不可达
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import check_tools  # noqa: E402
+
+LINK_COUNT = 24
+TIMEOUT = 1
+RETRIES = 2
+MAX_ELAPSED = 8  # 不熔断时 24 个 URL 各自超时重试需要 12 秒以上
+
+
+@pytest.fixture
+def silent_host():
+    """接受连接、读取请求但从不回复的本地服务，返回其地址 host:port"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', 0))
+    server.listen(128)
+    connections = []
+    stopped = threading.Event()
+
+    def accept():
+        while not stopped.is_set():
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            connections.append(conn)
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield f'127.0.0.1:{server.getsockname()[1]}'
+    stopped.set()
+    server.close()
+    for conn in connections:
+        conn.close()
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(check_tools, 'TIMEOUT', TIMEOUT)
+    monkeypatch.setattr(check_tools, 'RETRY_ATTEMPTS', RETRIES)
+    monkeypatch.setattr(check_tools, 'RETRY_BACKOFF', 0.01)
+    monkeypatch.setattr(check_tools, 'SHOW_PROGRESS', False)
+    monkeypatch.setattr(check_tools, 'RESULT_CACHE', None)
+    monkeypatch.setattr(check_tools, 'SESSION_MANAGER', check_tools.SessionManager())
+    monkeypatch.setattr(check_tools, 'CIRCUIT_BREAKER', check_tools.CircuitBreaker(threshold=3, cooldown=60))
+    return check_tools.CIRCUIT_BREAKER
+
+
+def run_engine(engine: str, links):
+    if engine == 'async':
+        return check_tools.check_links_async(links, max_concurrency=50, per_host_limit=4)
+    return check_tools.check_links_parallel(links)
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_silent_host_trips_breaker(engine, silent_host, breaker):
+    if engine == 'async' and check_tools.aiohttp is None:
+        pytest.skip('需要 aiohttp')
+    links = [(f'link {i}', f'http://{silent_host}/page/{i}') for i in range(LINK_COUNT)]
+
+    started = time.perf_counter()
+    results = run_engine(engine, links)
+    elapsed = time.perf_counter() - started
+
+    messages = [r['message'] for r in results]
+    unreachable = [m for m in messages if m.startswith('主机不可达')]
+    assert len(results) == LINK_COUNT
+    assert all(r['status'] == check_tools.Status.ERROR for r in results)
+    assert len(unreachable) >= LINK_COUNT // 2
+    assert elapsed < MAX_ELAPSED
+    assert breaker.open_hosts() == [silent_host]
+
+
+def test_half_open_probe_allows_retries_of_the_probe_only(breaker):
+    breaker.cooldown = 0
+    for _ in range(breaker.threshold):
+        breaker.record_failure('example.com')
+
+    assert breaker.allow('example.com')  # 冷却结束，获得探测机会
+    assert not breaker.allow('example.com')  # 探测进行中，其他 URL 被拦下
+    assert breaker.allow('example.com', retry=True)  # 探测 URL 自己的重试
+    breaker.record_success('example.com')
+    assert breaker.open_hosts() == []